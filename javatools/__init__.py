@@ -31,17 +31,15 @@ References
 """  # noqa
 
 
-from functools import partial
-from six.moves import range
+import re
 
-from .dirutils import fnmatches
-from .opcodes import disassemble
-from .pack import compile_struct, unpack, UnpackException
+from bisect import bisect_left
+from six import text_type
+from struct import Struct, error as StructError
 
-try:
-    buffer
-except NameError:
-    buffer = memoryview
+from .dirutils import fnmatcher
+from .opcodes import disassemble
+from .pack import compile_struct, unpack, BufferUnpacker, UnpackException
 
 
 __all__ = (
@@ -73,6 +71,12 @@ __all__ = (
 # the four bytes at the start of every class file
 JAVA_CLASS_MAGIC = (0xCA, 0xFE, 0xBA, 0xBE)
 
+# the same four bytes, read as a single big-endian u4
+JAVA_CLASS_MAGIC_INT = 0xCAFEBABE
+
+# and as they appear in the raw data
+JAVA_CLASS_MAGIC_BYTES = b"\xCA\xFE\xBA\xBE"
+
 
 _BUFFERING = 2 ** 14
 
@@ -121,17 +125,106 @@ ACC_ENUM = 0x4000
 ACC_MODULE = 0x8000
 
 
+# access flag keywords, in the order they are presented. For classes
+# each entry is a mask, the value the masked flags must match, and the
+# keyword. An annotation is also flagged as an interface, but only one
+# of the two keywords is shown.
+_class_flag_names = (
+    (ACC_PUBLIC, ACC_PUBLIC, "public"),
+    (ACC_FINAL, ACC_FINAL, "final"),
+    (ACC_ABSTRACT, ACC_ABSTRACT, "abstract"),
+    (ACC_INTERFACE | ACC_ANNOTATION, ACC_INTERFACE | ACC_ANNOTATION,
+     "@interface"),
+    (ACC_INTERFACE | ACC_ANNOTATION, ACC_INTERFACE, "interface"),
+    (ACC_ENUM, ACC_ENUM, "enum"),
+)
+
+_member_flag_names = (
+    (ACC_PUBLIC, "public"),
+    (ACC_PRIVATE, "private"),
+    (ACC_PROTECTED, "protected"),
+    (ACC_STATIC, "static"),
+    (ACC_FINAL, "final"),
+    (ACC_STRICT, "strict"),
+    (ACC_NATIVE, "native"),
+    (ACC_ABSTRACT, "abstract"),
+    (ACC_ENUM, "enum"),
+    (ACC_MODULE, "module"),
+)
+
+_method_showall_flag_names = (
+    (ACC_BRIDGE, "bridge"),
+    (ACC_VARARGS, "varargs"),
+)
+
+_field_flag_names = (
+    (ACC_TRANSIENT, "transient"),
+    (ACC_VOLATILE, "volatile"),
+)
+
+
+# constant pool types grouped by how deref_const resolves them
+_DEREF_SIMPLE = frozenset((CONST_Utf8, CONST_Integer, CONST_Float,
+                           CONST_Long, CONST_Double))
+
+_DEREF_INDIRECT = frozenset((CONST_Class, CONST_String, CONST_MethodType,
+                             CONST_Module, CONST_Package))
+
+_DEREF_COMPOUND = frozenset((CONST_Fieldref, CONST_Methodref,
+                             CONST_InterfaceMethodref, CONST_NameAndType,
+                             CONST_ModuleId))
+
+_DEREF_BOOTSTRAP = frozenset((CONST_InvokeDynamic, CONST_Dynamic))
+
+
+# constant pool types which reference the API required by a class
+_REQUIRES_TYPES = frozenset((CONST_Class, CONST_Fieldref,
+                             CONST_Methodref, CONST_InterfaceMethodref))
+
+
 # commonly re-occurring struct formats
 _B = compile_struct(">B")
-_BBBB = compile_struct(">BBBB")
 _BH = compile_struct(">BH")
 _H = compile_struct(">H")
 _HH = compile_struct(">HH")
 _HHH = compile_struct(">HHH")
 _HHHH = compile_struct(">HHHH")
-_HHHHH = compile_struct(">HHHHH")
 _HI = compile_struct(">HI")
 _HHI = compile_struct(">HHI")
+_I = compile_struct(">I")
+
+
+# structs for arrays of u2 values (such as interface or exception
+# constant pool indexes, or whole line number tables), keyed by the
+# length of the array. Only the lengths up to _H_ARRAYS_MAXCOUNT are
+# kept, which covers nearly every table. Longer ones are rare enough
+# that they get a struct of their own rather than growing the cache.
+_H_arrays = dict()
+_H_ARRAYS_MAXCOUNT = 512
+
+
+def _h_array(count):
+    """
+    the struct for unpacking count u2 values in a single call
+    """
+
+    sfmt = _H_arrays.get(count)
+    if sfmt is None:
+        sfmt = Struct(">%iH" % count)
+        if count <= _H_ARRAYS_MAXCOUNT:
+            _H_arrays[count] = sfmt
+    return sfmt
+
+
+def _unpack_u2_table(unpacker, width):
+    """
+    reads a u2 count followed by that many rows of width u2 values in
+    a single struct call, and returns a tuple of the row tuples
+    """
+
+    (count,) = unpacker.unpack_struct(_H)
+    items = unpacker.unpack_struct(_h_array(count * width))
+    return tuple(zip(*(items[i::width] for i in range(width))))
 
 
 class NoPoolException(Exception):
@@ -177,12 +270,30 @@ class JavaConstantPool(object):
     """  # noqa
 
     def __init__(self):
-        self.consts = tuple()
+        # the pool is kept as parallel sequences of the type and the
+        # raw value of each entry. A type of 0 marks an index with no
+        # entry (index 0, and the second half of a long or double)
+        self.tags = bytearray()
+        self.vals = list()
+
+        # cache of dereferenced values, indexed the same as vals
+        self._deref_cache = list()
+
+
+    @property
+    def consts(self):
+        """
+        tuple of the (type, value) pairs of the constant pool. The type
+        is None for indexes which have no entry.
+        """
+
+        return tuple((t or None, v) for t, v in zip(self.tags, self.vals))
 
 
     def __eq__(self, other):
         return (isinstance(other, JavaConstantPool) and
-                (self.consts == other.consts))
+                (self.tags == other.tags) and
+                (self.vals == other.vals))
 
 
     def __ne__(self, other):
@@ -196,9 +307,22 @@ class JavaConstantPool(object):
 
         (count, ) = unpacker.unpack_struct(_H)
 
+        if isinstance(unpacker, BufferUnpacker) and unpacker.data:
+            # walk the underlying buffer directly rather than paying
+            # for an unpacker method call per field of every item
+            tags, vals, offset = _unpack_const_buffer(unpacker.data,
+                                                      unpacker.offset, count)
+            unpacker.offset = offset
+
+            self.tags = tags
+            self.vals = vals
+            self._deref_cache = [None] * len(vals)
+            return
+
         # first item is never present in the actual data buffer, but
         # the count number acts like it would be.
-        items = [(None, None), ]
+        tags = bytearray(1)
+        vals = [None]
         count -= 1
 
         # Long and Double const types will "consume" an item count,
@@ -210,18 +334,22 @@ class JavaConstantPool(object):
             if hackpass:
                 # previous item was a long or double
                 hackpass = False
-                items.append((None, None))
+                tags.append(0)
+                vals.append(None)
 
             else:
-                item = _unpack_const_item(unpacker)
-                items.append(item)
+                t, v = _unpack_const_item(unpacker)
+                tags.append(t)
+                vals.append(v)
 
                 # if this item was a long or double, skip the next
                 # counter.
-                if item[0] in (CONST_Long, CONST_Double):
+                if t in (CONST_Long, CONST_Double):
                     hackpass = True
 
-        self.consts = items
+        self.tags = tags
+        self.vals = vals
+        self._deref_cache = [None] * len(vals)
 
 
     def get_const(self, index):
@@ -229,7 +357,7 @@ class JavaConstantPool(object):
         returns the type and value of the constant at index
         """
 
-        return self.consts[index]
+        return (self.tags[index] or None, self.vals[index])
 
 
     def deref_const(self, index):
@@ -243,7 +371,23 @@ class JavaConstantPool(object):
         if not index:
             raise IndexError("Requested const 0")
 
-        t, v = self.consts[index]
+        # the pool is immutable once unpacked, so any value we've
+        # already dereferenced can be handed right back
+        result = self._deref_cache[index]
+        if result is None:
+            result = self._deref_const(index)
+            self._deref_cache[index] = result
+
+        return result
+
+
+    def _deref_const(self, index):
+        """
+        the uncached implementation of deref_const
+        """
+
+        t = self.tags[index]
+        v = self.vals[index]
 
         # CONSTANT_info {
         #     u1 tag;
@@ -251,8 +395,7 @@ class JavaConstantPool(object):
         # }
         # NOTE: Long and Double has high_bytes and low_bytes.
         # NOTE: Utf8 has two fields length and bytes
-        if t in (CONST_Utf8, CONST_Integer, CONST_Float,
-                 CONST_Long, CONST_Double):
+        if t in _DEREF_SIMPLE:
             return v
 
         # CONSTANT_info {
@@ -260,8 +403,7 @@ class JavaConstantPool(object):
         #     u2 index; (valid index into the constant_pool)
         # }
         # NOTE: each constant can have a little bit different field name
-        elif t in (CONST_Class, CONST_String, CONST_MethodType,
-                   CONST_Module, CONST_Package):
+        elif t in _DEREF_INDIRECT:
             return self.deref_const(v)
 
         # CONSTANT_info {
@@ -270,10 +412,10 @@ class JavaConstantPool(object):
         #     u2 additional_index; (valid index into the constant_pool)
         # }
         # NOTE: each constant can have a little bit different field name
-        elif t in (CONST_Fieldref, CONST_Methodref,
-                   CONST_InterfaceMethodref, CONST_NameAndType,
-                   CONST_ModuleId):
-            return tuple(self.deref_const(i) for i in v)
+        elif t in _DEREF_COMPOUND:
+            # always a pair of indexes, so skip building a sequence
+            deref = self.deref_const
+            return (deref(v[0]), deref(v[1]))
 
         # CONSTANT_info {
         #     u1 tag;
@@ -283,7 +425,7 @@ class JavaConstantPool(object):
         #                                      this class file)
         #     u2 name_and_type_index; (valid index into the constant_pool)
         # }
-        elif t in (CONST_InvokeDynamic, CONST_Dynamic):
+        elif t in _DEREF_BOOTSTRAP:
             # TODO: v[0] needs to come from the bootstrap methods table
             return (v[0], self.deref_const(v[1]))
 
@@ -307,8 +449,9 @@ class JavaConstantPool(object):
         constant pool entries.
         """
 
-        for i in range(1, len(self.consts)):
-            t, _v = self.consts[i]
+        # index 0 and the second half of longs and doubles have no
+        # type, and are skipped
+        for i, t in enumerate(self.tags):
             if t:
                 yield (i, t, self.deref_const(i))
 
@@ -319,23 +462,40 @@ class JavaConstantPool(object):
         pool entries.
         """
 
-        for i in range(1, len(self.consts)):
+        for i in range(1, len(self.tags)):
             t, v = self.pretty_const(i)
             if t:
                 yield (i, t, v)
 
 
+    def iter_pretty_consts(self):
+        """
+        sequence of the pretty_const of each index of the constant pool
+        after the first, including (None, None) for invalid indexes
+        """
+
+        tags = self.tags
+        vals = self.vals
+
+        for i in range(1, len(tags)):
+            t = tags[i]
+            if t:
+                yield _pretty_const_type_val(t, vals[i])
+            else:
+                yield None, None
+
+
     def pretty_const(self, index):
         """
         a tuple of the pretty type and val, or (None, None) for invalid
         indexes (such as the second part of a long or double value)
         """
 
-        t, v = self.consts[index]
+        t = self.tags[index]
         if not t:
             return None, None
         else:
-            return _pretty_const_type_val(t, v)
+            return _pretty_const_type_val(t, self.vals[index])
 
 
     def pretty_deref_const(self, index):
@@ -347,75 +507,20 @@ class JavaConstantPool(object):
         and value derefenced constants)
         """
 
-        t, v = self.consts[index]
-
-        if t == CONST_String:
-            result = self.deref_const(v)
-
-        elif t in (CONST_Utf8,
-                   CONST_Integer, CONST_Float,
-                   CONST_Long, CONST_Double):
-            result = v
-
-        elif t == CONST_Class:
-            result = _pretty_class(self.deref_const(v))
-
-        elif t == CONST_Fieldref:
-            cn = self.deref_const(v[0])
-            cn = _pretty_class(cn)
-
-            n, t = self.deref_const(v[1])
-
-            result = "%s.%s:%s" % (cn, n, _pretty_type(t))
-
-        elif t in (CONST_Methodref,
-                   CONST_InterfaceMethodref):
-
-            cn = self.deref_const(v[0])
-            cn = _pretty_class(cn)
-
-            n, t = self.deref_const(v[1])
+        t = self.tags[index]
+        v = self.vals[index]
 
-            args, ret = tuple(_pretty_typeseq(t))
-
-            result = "%s.%s%s:%s" % (cn, n, args, ret)
-
-        elif t == CONST_NameAndType:
-            a, b = (self.deref_const(i) for i in v)
-            b = "".join(_pretty_typeseq(b))
-            result = "%s:%s" % (a, b)
-
-        elif t == CONST_ModuleId:
-            a, b = (self.deref_const(i) for i in v)
-            result = "%s@%s" % (a, b)
-
-        elif t == CONST_InvokeDynamic:
-            # TODO: v[0] needs to come from the bootstrap methods table
-            result = "InvokeDynamic %r %r" % (v[0], self.deref_const(v[1]))
-
-        elif t == CONST_Dynamic:
-            # TODO: v[0] needs to come from the bootstrap methods table
-            result = "Dynamic %r %r" % (v[0], self.deref_const(v[1]))
-
-        elif t == CONST_MethodType:
-            result = "MethodType %r %r" % (v[0], self.deref_const(v[1]))
-
-        elif t == CONST_Module:
-            result = "Module %s" % self.deref_cons(v[0])
-
-        elif t == CONST_Package:
-            result = "Package %s" % self.deref_cons(v[0])
-
-        elif not t:
+        if not t:
             # the skipped-type, meaning the prior index was a
             # two-slotter.
-            result = ""
+            return ""
 
-        else:
+        pretty = _pretty_deref_handlers.get(t)
+        if pretty is None:
             raise UnknownConstantPoolTagException(
                 "No pretty for const type %r" % t)
 
-        return result
+        return pretty(self, v)
 
 
 class JavaAttributes(dict):
@@ -439,10 +544,14 @@ class JavaAttributes(dict):
         # bound method for dereferencing constants
         cval = self.cpool.deref_const
 
+        # attribute bodies are kept as views onto the class data
+        # where possible, rather than copied out of it
+        read = unpacker.read_view
+
         (count,) = unpacker.unpack_struct(_H)
         for _i in range(0, count):
             (name, size) = unpacker.unpack_struct(_HI)
-            self[cval(name)] = unpacker.read(size)
+            self[cval(name)] = read(size)
 
 
 class JavaClassInfo(object):
@@ -471,6 +580,14 @@ class JavaClassInfo(object):
         self._provides_private = None
         self._requires = None
 
+        # filtered provides and requires, keyed by their arguments
+        self._provides_filtered = dict()
+        self._requires_filtered = dict()
+
+        # lazily built indexes of members by name
+        self._fields_by_name = None
+        self._methods_by_name = None
+
 
     def deref_const(self, index):
         """
@@ -499,17 +616,15 @@ class JavaClassInfo(object):
         """
 
         # only unpack the magic bytes if it wasn't specified
-        magic = magic or unpacker.unpack_struct(_BBBB)
-
-        if isinstance(magic, (str, buffer)):
-            magic = tuple(ord(m) for m in magic)
+        if magic:
+            magic = _magic_as_int(magic)
         else:
-            magic = tuple(magic)
+            (magic,) = unpacker.unpack_struct(_I)
 
-        if magic != JAVA_CLASS_MAGIC:
+        if magic != JAVA_CLASS_MAGIC_INT:
             raise ClassUnpackException("Not a Java class file")
 
-        self.magic = magic
+        self.magic = JAVA_CLASS_MAGIC
 
         # unpack (minor, major), store as (major, minor)
         self.version = unpacker.unpack_struct(_HH)[::-1]
@@ -524,17 +639,16 @@ class JavaClassInfo(object):
 
         # unpack interfaces
         (count,) = unpacker.unpack_struct(_H)
-        self.interfaces = unpacker.unpack(">%iH" % count)
-
-        uobjs = unpacker.unpack_objects
+        self.interfaces = unpacker.unpack_struct(_h_array(count))
 
         # unpack fields
-        self.fields = tuple(uobjs(JavaMemberInfo,
-                                  self.cpool, is_method=False))
+        self.fields = _unpack_members(unpacker, self.cpool, False)
 
         # unpack methods
-        self.methods = tuple(uobjs(JavaMemberInfo,
-                                   self.cpool, is_method=True))
+        self.methods = _unpack_members(unpacker, self.cpool, True)
+
+        self._fields_by_name = None
+        self._methods_by_name = None
 
         # unpack attributes
         self.attribs.unpack(unpacker)
@@ -545,10 +659,12 @@ class JavaClassInfo(object):
         the field member matching name, or None if no such field is found
         """
 
-        for f in self.fields:
-            if f.get_name() == name:
-                return f
-        return None
+        index = self._fields_by_name
+        if index is None:
+            index = self._fields_by_name = _index_by_name(self.fields)
+
+        found = index.get(name)
+        return found[0] if found else None
 
 
     def get_methods_by_name(self, name):
@@ -557,7 +673,11 @@ class JavaClassInfo(object):
         present.
         """
 
-        return (m for m in self.methods if m.get_name() == name)
+        index = self._methods_by_name
+        if index is None:
+            index = self._methods_by_name = _index_by_name(self.methods)
+
+        return iter(index.get(name, ()))
 
 
     def get_method(self, name, arg_types=()):
@@ -582,7 +702,7 @@ class JavaClassInfo(object):
         arg_types = tuple(arg_types)
 
         for m in self.get_methods_by_name(name):
-            if (((not m.is_bridge()) and
+            if (((not m.access_flags & ACC_BRIDGE) and
                  m.get_arg_type_descriptors() == arg_types)):
                 return m
         return None
@@ -596,7 +716,7 @@ class JavaClassInfo(object):
         """
 
         for m in self.get_methods_by_name(name):
-            if ((m.is_bridge() and
+            if ((m.access_flags & ACC_BRIDGE and
                  m.get_arg_type_descriptors() == arg_types)):
                 yield m
 
@@ -711,25 +831,6 @@ class JavaClassInfo(object):
         return tuple(self.deref_const(i) for i in self.interfaces)
 
 
-    def _get_annotations(self, python_attr_name, java_attr_name):
-
-        annos = getattr(self, python_attr_name)
-
-        if annos is None:
-            buff = self.get_attribute(java_attr_name)
-            if buff is None:
-                annos = tuple()
-
-            else:
-                with unpack(buff) as up:
-                    annos = up.unpack_objects(JavaAnnotation, self.cpool)
-                    annos = tuple(annos)
-
-            setattr(self, python_attr_name, annos)
-
-        return annos
-
-
     def get_annotations(self):
         """
         The RuntimeVisibleAnnotations attribute. A tuple of JavaAnnotation
@@ -738,8 +839,13 @@ class JavaClassInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.16
         """  # noqa
 
-        return self._get_annotations("annotations",
-                                     "RuntimeVisibleAnnotations")
+        annos = self.annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeVisibleAnnotations")
+            annos = _unpack_annotations(buff, self.cpool)
+            self.annotations = annos
+
+        return annos
 
 
     def get_invisible_annotations(self):
@@ -750,8 +856,13 @@ class JavaClassInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.17
         """  # noqa
 
-        return self._get_annotations("invisible_annotations",
-                                     "RuntimeInvisibleAnnotations")
+        annos = self.invisible_annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeInvisibleAnnotations")
+            annos = _unpack_annotations(buff, self.cpool)
+            self.invisible_annotations = annos
+
+        return annos
 
 
     def get_sourcefile(self):
@@ -779,7 +890,7 @@ class JavaClassInfo(object):
         """  # noqa
 
         buff = self.get_attribute("SourceDebugExtension")
-        return (buff and str(buff)) or None
+        return (buff and _decode_utf8(_as_bytes(buff))) or None
 
 
     def get_innerclasses(self):
@@ -794,8 +905,16 @@ class JavaClassInfo(object):
         if buff is None:
             return tuple()
 
+        cpool = self.cpool
+        result = list()
         with unpack(buff) as up:
-            return tuple(up.unpack_objects(JavaInnerClassInfo, self.cpool))
+            for entry in _unpack_u2_table(up, 4):
+                info = JavaInnerClassInfo(cpool)
+                (info.inner_info_ref, info.outer_info_ref,
+                 info.name_ref, info.access_flags) = entry
+                result.append(info)
+
+        return tuple(result)
 
 
     def get_signature(self):
@@ -861,32 +980,14 @@ class JavaClassInfo(object):
         return result
 
 
-    def _pretty_access_flags_gen(self):
-        """
-        generator of the pretty access flags
-        """
-
-        if self.is_public():
-            yield "public"
-        if self.is_final():
-            yield "final"
-        if self.is_abstract():
-            yield "abstract"
-        if self.is_interface():
-            if self.is_annotation():
-                yield "@interface"
-            else:
-                yield "interface"
-        if self.is_enum():
-            yield "enum"
-
-
     def pretty_access_flags(self):
         """
-        generator of the pretty access flag names
+        tuple of the pretty access flag names
         """
 
-        return self._pretty_access_flags_gen()
+        af = self.access_flags
+        return tuple([name for mask, match, name in _class_flag_names
+                      if af & mask == match])
 
 
     def pretty_this(self):
@@ -944,11 +1045,11 @@ class JavaClassInfo(object):
         yield me
 
         for field in self.fields:
-            if private or field.is_public():
+            if private or field.access_flags & ACC_PUBLIC:
                 yield "%s.%s" % (me, field.pretty_identifier())
 
         for method in self.methods:
-            if private or method.is_public():
+            if private or method.access_flags & ACC_PUBLIC:
                 yield "%s.%s" % (me, method.pretty_identifier())
 
 
@@ -958,19 +1059,19 @@ class JavaClassInfo(object):
         mining the constant pool for such types
         """
 
-        provided = set(self.get_provides(private=True))
+        provided = self._get_provides_set(True)
         cpool = self.cpool
 
-        # loop through the constant pool for API types
-        for i, t, _v in cpool.constants():
+        # loop through the constant pool types for API types. Only
+        # the matching entries need to be dereferenced at all
+        for i, t in enumerate(cpool.tags):
 
-            if t in (CONST_Class, CONST_Fieldref,
-                     CONST_Methodref, CONST_InterfaceMethodref):
+            if t in _REQUIRES_TYPES:
 
                 # convert this away from unicode so we can
                 pv = str(cpool.pretty_deref_const(i))
 
-                if pv[0] == "[":
+                if pv.startswith("["):
                     # sometimes when calling operations on an array
                     # the type embeded in the cpool will be the array
                     # type, not just the class type. Let's only gather
@@ -979,32 +1080,54 @@ class JavaClassInfo(object):
                     # the event that this was a method or field on the
                     # array, we'll throw away that as well, and just
                     # emit the type contained in the array.
-                    t = _typeseq(pv)[0]
-                    if t[1] == "L":
-                        pv = _pretty_type(t[1:])
-                    else:
-                        pv = None
+                    if not pv.startswith("[L"):
+                        # primitive (or nested) arrays
+                        continue
+
+                    # pretty_deref_const has already converted the
+                    # class name, so just cut it out from between
+                    # the L and the ;
+                    pv = pv[2:pv.find(";")]
 
                 if pv and (pv not in provided):
                     yield pv
 
 
-    def get_provides(self, ignored=tuple(), private=False):
+    def _get_provides_set(self, private=False):
         """
-        The provided API, including the class itself, its fields, and its
-        methods.
+        frozenset of the provided API
         """
 
         if private:
-            if self._provides_private is None:
-                self._provides_private = set(self._get_provides(True))
             provides = self._provides_private
+            if provides is None:
+                provides = frozenset(self._get_provides(True))
+                self._provides_private = provides
         else:
-            if self._provides is None:
-                self._provides = set(self._get_provides(False))
             provides = self._provides
+            if provides is None:
+                provides = frozenset(self._get_provides(False))
+                self._provides = provides
+
+        return provides
+
+
+    def get_provides(self, ignored=tuple(), private=False):
+        """
+        The provided API, including the class itself, its fields, and its
+        methods.
+        """
+
+        key = (private, tuple(ignored))
+        found = self._provides_filtered.get(key)
 
-        return [prov for prov in provides if not fnmatches(prov, *ignored)]
+        if found is None:
+            provides = self._get_provides_set(private)
+            matches = fnmatcher(*ignored)
+            found = tuple(prov for prov in provides if not matches(prov))
+            self._provides_filtered[key] = found
+
+        return list(found)
 
 
     def get_requires(self, ignored=tuple()):
@@ -1013,11 +1136,20 @@ class JavaClassInfo(object):
         methods that this class references
         """
 
-        if self._requires is None:
-            self._requires = set(self._get_requires())
+        key = tuple(ignored)
+        found = self._requires_filtered.get(key)
+
+        if found is None:
+            requires = self._requires
+            if requires is None:
+                requires = frozenset(self._get_requires())
+                self._requires = requires
 
-        requires = self._requires
-        return [req for req in requires if not fnmatches(req, *ignored)]
+            matches = fnmatcher(*ignored)
+            found = tuple(req for req in requires if not matches(req))
+            self._requires_filtered[key] = found
+
+        return list(found)
 
 
 class JavaMemberInfo(object):
@@ -1037,6 +1169,22 @@ class JavaMemberInfo(object):
         self.parameter_annotations = None
         self.invisible_parameter_annotations = None
 
+        # cache of the dereferenced name and descriptor
+        self._name = None
+        self._descriptor = None
+
+        # caches of values derived from the above, which the diffing
+        # code asks for over and over
+        self._identifier = None
+        self._pretty_identifier = None
+        self._pretty_descriptor = None
+        self._type_descriptor = None
+        self._arg_type_descriptors = None
+
+        # caches of the decoded Code and Exceptions attributes
+        self._code = None
+        self._exceptions = None
+
 
     def deref_const(self, index):
         """
@@ -1111,7 +1259,10 @@ class JavaMemberInfo(object):
         the name of this member
         """
 
-        return self.deref_const(self.name_ref)
+        name = self._name
+        if name is None:
+            name = self._name = self.deref_const(self.name_ref)
+        return name
 
 
     def get_descriptor(self):
@@ -1119,7 +1270,10 @@ class JavaMemberInfo(object):
         the descriptor of this member
         """
 
-        return self.deref_const(self.descriptor_ref)
+        desc = self._descriptor
+        if desc is None:
+            desc = self._descriptor = self.deref_const(self.descriptor_ref)
+        return desc
 
 
     def is_public(self):
@@ -1263,33 +1417,6 @@ class JavaMemberInfo(object):
         return bool(self.get_attribute("Deprecated"))
 
 
-    def _get_annotations(self, python_attr_name, java_attr_name,
-                         for_params=False):
-
-        annos = getattr(self, python_attr_name)
-
-        if annos is None:
-            buff = self.get_attribute(java_attr_name)
-            if buff is None:
-                annos = tuple()
-
-            else:
-                with unpack(buff) as up:
-                    unp = partial(up.unpack_objects,
-                                  JavaAnnotation, self.cpool)
-
-                    if for_params:
-                        (param_count, ) = up.unpack_struct(_B)
-                        annos = (tuple(unp()) for _i in range(param_count))
-                    else:
-                        annos = unp()
-                    annos = tuple(annos)
-
-            setattr(self, python_attr_name, annos)
-
-        return annos
-
-
     def get_annotations(self):
         """
         The RuntimeVisibleAnnotations attribute. A tuple of JavaAnnotation
@@ -1298,8 +1425,13 @@ class JavaMemberInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.16
         """  # noqa
 
-        return self._get_annotations("annotations",
-                                     "RuntimeVisibleAnnotations")
+        annos = self.annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeVisibleAnnotations")
+            annos = _unpack_annotations(buff, self.cpool)
+            self.annotations = annos
+
+        return annos
 
 
     def get_invisible_annotations(self):
@@ -1310,8 +1442,13 @@ class JavaMemberInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.17
         """  # noqa
 
-        return self._get_annotations("invisible_annotations",
-                                     "RuntimeInvisibleAnnotations")
+        annos = self.invisible_annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeInvisibleAnnotations")
+            annos = _unpack_annotations(buff, self.cpool)
+            self.invisible_annotations = annos
+
+        return annos
 
 
     def get_parameter_annotations(self):
@@ -1321,9 +1458,13 @@ class JavaMemberInfo(object):
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.18
         """  # noqa
-        return self._get_annotations("parameter_annotations",
-                                     "RuntimeVisibleParameterAnnotations",
-                                     for_params=True)
+        annos = self.parameter_annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeVisibleParameterAnnotations")
+            annos = _unpack_parameter_annotations(buff, self.cpool)
+            self.parameter_annotations = annos
+
+        return annos
 
 
     def get_invisible_parameter_annotations(self):
@@ -1333,9 +1474,13 @@ class JavaMemberInfo(object):
 
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.19
         """  # noqa
-        return self._get_annotations("invisible_parameter_annotations",
-                                     "RuntimeInvisibleParameterAnnotations",
-                                     for_params=True)
+        annos = self.invisible_parameter_annotations
+        if annos is None:
+            buff = self.get_attribute("RuntimeInvisibleParameterAnnotations")
+            annos = _unpack_parameter_annotations(buff, self.cpool)
+            self.invisible_parameter_annotations = annos
+
+        return annos
 
 
     def get_annotationdefault(self):
@@ -1376,13 +1521,19 @@ class JavaMemberInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.3
         """  # noqa
 
-        buff = self.get_attribute("Code")
-        if buff is None:
-            return None
+        code = self._code
+        if code is None:
+            buff = self.get_attribute("Code")
+            if buff is None:
+                return None
 
-        with unpack(buff) as up:
-            code = JavaCodeInfo(self.cpool)
-            code.unpack(up)
+            # the exception table and attributes of the code are
+            # left until something asks for them
+            with unpack(buff) as up:
+                code = JavaCodeInfo(self.cpool)
+                code.unpack(up, lazy=True)
+
+            self._code = code
 
         return code
 
@@ -1395,13 +1546,21 @@ class JavaMemberInfo(object):
         reference: http://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.7.5
         """  # noqa
 
-        buff = self.get_attribute("Exceptions")
-        if buff is None:
-            return ()
+        excs = self._exceptions
+        if excs is None:
+            buff = self.get_attribute("Exceptions")
+            if buff is None:
+                excs = ()
 
-        with unpack(buff) as up:
-            return tuple(self.deref_const(e[0]) for e
-                         in up.unpack_struct_array(_H))
+            else:
+                with unpack(buff) as up:
+                    (count,) = up.unpack_struct(_H)
+                    refs = up.unpack_struct(_h_array(count))
+                excs = tuple(map(self.deref_const, refs))
+
+            self._exceptions = excs
+
+        return excs
 
 
     def get_constantvalue(self):
@@ -1441,7 +1600,12 @@ class JavaMemberInfo(object):
         builtin java types.
         """
 
-        return _typeseq(self.get_descriptor())[-1]
+        td = self._type_descriptor
+        if td is None:
+            td = _typeseq(self.get_descriptor())[-1]
+            self._type_descriptor = td
+
+        return td
 
 
     def get_arg_type_descriptors(self):
@@ -1454,10 +1618,11 @@ class JavaMemberInfo(object):
         if not self.is_method:
             return tuple()
 
-        desc = self.get_descriptor()
-
-        tp = _typeseq(desc)
-        tp = _typeseq(tp[0][1:-1])
+        tp = self._arg_type_descriptors
+        if tp is None:
+            tp = _typeseq(self.get_descriptor())
+            tp = _typeseq(tp[0][1:-1])
+            self._arg_type_descriptors = tp
 
         return tp
 
@@ -1472,12 +1637,11 @@ class JavaMemberInfo(object):
 
     def pretty_arg_types(self):
         """
-        Sequence of pretty argument types.
+        Tuple of pretty argument types.
         """
 
         if self.is_method:
-            types = self.get_arg_type_descriptors()
-            return (_pretty_type(t) for t in types)
+            return tuple(map(_pretty_type, self.get_arg_type_descriptors()))
         else:
             return tuple()
 
@@ -1488,6 +1652,13 @@ class JavaMemberInfo(object):
         types, exceptions as applicable
         """
 
+        pretty = self._pretty_descriptor
+        if pretty is None:
+            pretty = self._pretty_descriptor = self._make_pretty_descriptor()
+        return pretty
+
+
+    def _make_pretty_descriptor(self):
         f = " ".join(self.pretty_access_flags())
         p = self.pretty_type()
         n = self.get_name()
@@ -1506,65 +1677,41 @@ class JavaMemberInfo(object):
             # assemble any throws as necessary
             t = "throws " + t
 
-        return " ".join(z for z in (f, p, n, t) if z)
-
-
-    def _pretty_access_flags_gen(self, showall=False):
-
-        if self.is_public():
-            yield "public"
-        if self.is_private():
-            yield "private"
-        if self.is_protected():
-            yield "protected"
-        if self.is_static():
-            yield "static"
-        if self.is_final():
-            yield "final"
-        if self.is_strict():
-            yield "strict"
-        if self.is_native():
-            yield "native"
-        if self.is_abstract():
-            yield "abstract"
-        if self.is_enum():
-            yield "enum"
-        if self.is_module():
-            yield "module"
+        return " ".join(filter(None, (f, p, n, t)))
+
+
+    def pretty_access_flags(self, showall=False):
+        """
+        tuple of the keywords determined from the access flags
+        """
+
+        af = self.access_flags
+        found = [name for mask, name in _member_flag_names if af & mask]
 
         if showall and self.is_synthetic():
-            yield "synthetic"
+            found.append("synthetic")
 
         if self.is_method:
-            if self.is_synchronized():
-                yield "synchronized"
+            if af & ACC_SYNCHRONIZED:
+                found.append("synchronized")
 
-            if showall and self.is_bridge():
-                yield "bridge"
-            if showall and self.is_varargs():
-                yield "varargs"
+            if showall:
+                found.extend([name for mask, name
+                              in _method_showall_flag_names if af & mask])
 
         else:
-            if self.is_transient():
-                yield "transient"
-            if self.is_volatile():
-                yield "volatile"
-
+            found.extend([name for mask, name in _field_flag_names
+                          if af & mask])
 
-    def pretty_access_flags(self, showall=False):
-        """
-        generator of the keywords determined from the access flags
-        """
-
-        return self._pretty_access_flags_gen(showall)
+        return tuple(found)
 
 
     def pretty_exceptions(self):
         """
-        sequence of pretty names for get_exceptions()
+        tuple of pretty names for get_exceptions()
         """
 
-        return (_pretty_class(e) for e in self.get_exceptions())
+        return tuple([e.replace("/", ".") for e in self.get_exceptions()])
 
 
     def get_identifier(self):
@@ -1578,15 +1725,20 @@ class JavaMemberInfo(object):
         return type.
         """
 
+        ident = self._identifier
+        if ident is not None:
+            return ident
+
         ident = self.get_name()
 
         if self.is_method:
             args = ",".join(self.get_arg_type_descriptors())
-            if self.is_bridge():
+            if self.access_flags & ACC_BRIDGE:
                 ident = "%s(%s):%s" % (ident, args, self.get_descriptor())
             else:
                 ident = "%s(%s)" % (ident, args)
 
+        self._identifier = ident
         return ident
 
 
@@ -1595,12 +1747,46 @@ class JavaMemberInfo(object):
         The pretty version of get_identifier
         """
 
-        ident = self.get_name()
-        if self.is_method:
-            args = ",".join(self.pretty_arg_types())
-            ident = "%s(%s)" % (ident, args)
+        pretty = self._pretty_identifier
+        if pretty is None:
+            ident = self.get_name()
+            if self.is_method:
+                args = ",".join(self.pretty_arg_types())
+                ident = "%s(%s)" % (ident, args)
+
+            pretty = "%s:%s" % (ident, self.pretty_type())
+            self._pretty_identifier = pretty
+
+        return pretty
+
+
+def _index_by_name(members):
+    """
+    dict mapping each name to the list of members having that name, in
+    their original order
+    """
+
+    index = dict()
+    for member in members:
+        index.setdefault(member.get_name(), []).append(member)
+    return index
+
+
+def _unpack_members(unpacker, cpool, is_method):
+    """
+    reads a count from the unpacker, and unpacks that many
+    JavaMemberInfo instances. Returns a tuple of the members
+    """
+
+    (count,) = unpacker.unpack_struct(_H)
+
+    members = [None] * count
+    for i in range(count):
+        member = JavaMemberInfo(cpool, is_method)
+        member.unpack(unpacker)
+        members[i] = member
 
-        return "%s:%s" % (ident, self.pretty_type())
+    return tuple(members)
 
 
 class JavaCodeInfo(object):
@@ -1612,11 +1798,15 @@ class JavaCodeInfo(object):
 
     def __init__(self, cpool):
         self.cpool = cpool
-        self.attribs = JavaAttributes(cpool)
         self.max_stack = 0
         self.max_locals = 0
         self.code = None
-        self.exceptions = tuple()
+
+        # the exception table and attributes, and the data they have
+        # yet to be unpacked from if that was deferred
+        self._exceptions = tuple()
+        self._attribs = JavaAttributes(cpool)
+        self._tables = None
 
         # cache of disassembled code
         self._dis_code = None
@@ -1624,6 +1814,12 @@ class JavaCodeInfo(object):
         # cache of linenumbertable
         self._lnt = None
 
+        # cache of the linenumbertable as parallel offset and line
+        # columns, and whether the offsets are in order and can be
+        # searched by bisection
+        self._lnt_columns = None
+        self._lnt_ordered = False
+
 
     def deref_const(self, index):
         """
@@ -1641,10 +1837,36 @@ class JavaCodeInfo(object):
         return self.attribs.get(name)
 
 
-    def unpack(self, unpacker):
+    @property
+    def exceptions(self):
+        """
+        tuple of the JavaExceptionInfo entries in the exception table
+        """
+
+        if self._tables is not None:
+            self._unpack_deferred()
+        return self._exceptions
+
+
+    @property
+    def attribs(self):
+        """
+        the JavaAttributes of this code block
+        """
+
+        if self._tables is not None:
+            self._unpack_deferred()
+        return self._attribs
+
+
+    def unpack(self, unpacker, lazy=False):
         """
         unpacks a code block from a buffer. Updates the internal structure
         of this instance
+
+        If lazy is True, the exception table and attributes following
+        the bytecode are taken to be the remainder of the unpacker's
+        data, and are only unpacked once they are first needed.
         """
 
         (a, b, c) = unpacker.unpack_struct(_HHI)
@@ -1653,10 +1875,37 @@ class JavaCodeInfo(object):
         self.max_locals = b
         self.code = unpacker.read(c)
 
-        uobjs = unpacker.unpack_objects
-        self.exceptions = tuple(uobjs(JavaExceptionInfo, self))
+        if lazy:
+            self._tables = unpacker.read_remaining()
+        else:
+            self._unpack_tables(unpacker)
 
-        self.attribs.unpack(unpacker)
+
+    def _unpack_tables(self, unpacker):
+        """
+        unpacks the exception table and attributes
+        """
+
+        excs = list()
+        for entry in _unpack_u2_table(unpacker, 4):
+            exc = JavaExceptionInfo(self)
+            (exc.start_pc, exc.end_pc,
+             exc.handler_pc, exc.catch_type_ref) = entry
+            excs.append(exc)
+        self._exceptions = tuple(excs)
+
+        self._attribs.unpack(unpacker)
+
+
+    def _unpack_deferred(self):
+        """
+        unpacks the exception table and attributes from the data put
+        aside by a lazy unpack
+        """
+
+        with unpack(self._tables) as up:
+            self._unpack_tables(up)
+        self._tables = None
 
 
     def get_linenumbertable(self):
@@ -1668,12 +1917,7 @@ class JavaCodeInfo(object):
 
         lnt = self._lnt
         if lnt is None:
-            buff = self.get_attribute("LineNumberTable")
-            if buff is None:
-                lnt = tuple()
-            else:
-                with unpack(buff) as up:
-                    lnt = tuple(up.unpack_struct_array(_HH))
+            lnt = tuple(zip(*self._get_lnt_columns()))
             self._lnt = lnt
         return lnt
 
@@ -1685,10 +1929,10 @@ class JavaCodeInfo(object):
         (they are relative to the method, not to the class file)
         """
 
-        lnt = self.get_linenumbertable()
-        if lnt:
-            lineoff = lnt[0][1]
-            return tuple((o, l - lineoff) for (o, l) in lnt)
+        offsets, lines = self._get_lnt_columns()
+        if lines:
+            lineoff = lines[0]
+            return tuple(zip(offsets, [l - lineoff for l in lines]))
         else:
             return tuple()
 
@@ -1706,7 +1950,7 @@ class JavaCodeInfo(object):
             return tuple()
 
         with unpack(buff) as up:
-            return tuple(up.unpack_struct_array(_HHHHH))
+            return _unpack_u2_table(up, 5)
 
 
     def get_localvariabletypetable(self):
@@ -1722,7 +1966,31 @@ class JavaCodeInfo(object):
             return tuple()
 
         with unpack(buff) as up:
-            return tuple(up.unpack_struct_array(_HHHHH))
+            return _unpack_u2_table(up, 5)
+
+
+    def _get_lnt_columns(self):
+        """
+        the linenumbertable as parallel (offsets, lines) tuples,
+        sliced directly out of the unpacked table
+        """
+
+        columns = self._lnt_columns
+        if columns is None:
+            buff = self.get_attribute("LineNumberTable")
+            if buff is None:
+                columns = ((), ())
+            else:
+                with unpack(buff) as up:
+                    (count,) = up.unpack_struct(_H)
+                    items = up.unpack_struct(_h_array(count * 2))
+                columns = (items[0::2], items[1::2])
+
+            offsets = columns[0]
+            self._lnt_ordered = (offsets == tuple(sorted(offsets)))
+            self._lnt_columns = columns
+
+        return columns
 
 
     def get_line_for_offset(self, code_offset):
@@ -1730,17 +1998,25 @@ class JavaCodeInfo(object):
         returns the line number given a code offset
         """
 
-        prev_line = 0
+        offsets, lines = self._get_lnt_columns()
 
-        for (offset, line) in self.get_linenumbertable():
-            if offset < code_offset:
-                prev_line = line
-            elif offset == code_offset:
-                return line
-            else:
-                return prev_line
+        if not self._lnt_ordered:
+            # out of order table, walk it the long way
+            prev_line = 0
+            for (offset, line) in self.get_linenumbertable():
+                if offset < code_offset:
+                    prev_line = line
+                elif offset == code_offset:
+                    return line
+                else:
+                    return prev_line
+            return prev_line
 
-        return prev_line
+        index = bisect_left(offsets, code_offset)
+        if index < len(offsets) and offsets[index] == code_offset:
+            return lines[index]
+        else:
+            return lines[index - 1] if index else 0
 
 
     def iter_code_by_lines(self):
@@ -1756,11 +2032,29 @@ class JavaCodeInfo(object):
 
         lnt_offset = lnt[0][1]
 
+        offsets, lines = self._get_lnt_columns()
+        ordered = self._lnt_ordered
+        count = len(lines)
+        index = 0
+
         cur_line = None
         current = None
 
         for codelet in self.disassemble():
-            abs_line = self.get_line_for_offset(codelet[0])
+            code_offset = codelet[0]
+
+            if not ordered:
+                abs_line = self.get_line_for_offset(code_offset)
+
+            else:
+                # the codelets are in offset order, so walk the table
+                # along with them rather than searching it each time
+                while index < count and offsets[index] < code_offset:
+                    index += 1
+                if index < count and offsets[index] == code_offset:
+                    abs_line = lines[index]
+                else:
+                    abs_line = lines[index - 1] if index else 0
 
             if cur_line == abs_line:
                 current.append(codelet)
@@ -1842,7 +2136,7 @@ class JavaExceptionInfo(object):
 
         ct = self.get_catch_type()
         if ct:
-            return "Class " + _pretty_class(ct)
+            return "Class " + ct.replace("/", ".")
         else:
             return "any"
 
@@ -1918,16 +2212,13 @@ class JavaAnnotation(dict):
         self.cpool = cpool
         self.type_ref = 0
 
+        # cache of the canonical form, for comparisons
+        self._canon = None
+
 
     def unpack(self, unpacker):
         self.type_ref, count = unpacker.unpack_struct(_HH)
-
-        for _i in range(0, count):
-            key_ref, = unpacker.unpack_struct(_H)
-            val = _unpack_annotation_val(unpacker, self.cpool)
-
-            key = self.cpool.deref_const(key_ref)
-            self[key] = val
+        _unpack_annotation_vals(unpacker, self.cpool, self, count)
 
 
     def pretty_type(self):
@@ -1950,69 +2241,112 @@ class JavaAnnotation(dict):
         return "%s(%s)" % (typename, ", ".join(elements))
 
 
-    def __eq__(self, other):
-        if not isinstance(other, JavaAnnotation):
-            return False
+    def _canonical(self):
+        """
+        a tuple of the dereferenced type name and the sorted element
+        names and values of this annotation. Comparable between
+        annotations from different constant pools.
+        """
 
-        # if we have a different type name, not equal
-        left = self.cpool.deref_const(self.type_ref)
-        right = other.cpool.deref_const(other.type_ref)
-        if left != right:
-            return False
+        canon = self._canon
+        if canon is None:
+            cpool = self.cpool
+            elements = sorted((key, _canonical_annotation_val(val, cpool))
+                              for key, val in self.items())
+            canon = (cpool.deref_const(self.type_ref), tuple(elements))
+            self._canon = canon
 
-        # if we have differing sets of keys, not equal
-        if self.keys() != other.keys():
+        return canon
+
+
+    def __eq__(self, other):
+        if not isinstance(other, JavaAnnotation):
             return False
 
-        # for each of the key/val pairs, check equality
-        for key, lval in self.items():
-            rval = other[key]
-            if not _annotation_val_eq(lval[0], lval[1], self.cpool,
-                                      rval[0], rval[1], other.cpool):
-                return False
-        return True
+        return self._canonical() == other._canonical()
 
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+
+    def __hash__(self):
+        return hash(self._canonical())
+
     def __repr__(self):
         return '@' + self.pretty_annotation()
 
 
-def _annotation_val_eq(left_tag, left_data, left_cpool,
-                       right_tag, right_data, right_cpool):
+def _unpack_annotations(buff, cpool):
+    """
+    tuple of the JavaAnnotation instances in an annotations attribute
+    buffer, or an empty tuple if buff is None
+    """
 
-    if left_tag != right_tag:
-        return False
+    if buff is None:
+        return tuple()
 
-    lconst = left_cpool.deref_const
-    rconst = right_cpool.deref_const
+    with unpack(buff) as up:
+        return tuple(up.unpack_objects(JavaAnnotation, cpool))
 
-    if left_tag in 'BCDFIJSZs':
-        return lconst(left_data) == rconst(right_data)
 
-    elif left_tag == 'e':
-        return ((lconst(left_data[0]) == rconst(right_data[0])) and
-                (lconst(left_data[1]) == rconst(right_data[1])))
+def _unpack_parameter_annotations(buff, cpool):
+    """
+    tuple of the tuples of JavaAnnotation instances for each parameter
+    in a parameter annotations attribute buffer, or an empty tuple if
+    buff is None
+    """
 
-    elif left_tag == 'c':
-        return lconst(left_data) == rconst(right_data)
+    if buff is None:
+        return tuple()
 
-    elif left_tag == '@':
-        return left_data == right_data
+    with unpack(buff) as up:
+        (param_count, ) = up.unpack_struct(_B)
+        return tuple(tuple(up.unpack_objects(JavaAnnotation, cpool))
+                     for _i in range(param_count))
+
+
+def _canonical_annotation_val(val, cpool):
+    """
+    a tag, data tuple of an annotation value with its constants
+    dereferenced, for comparison between constant pools
+    """
+
+    tag, data = val
+
+    canonical = _canonical_annotation_handlers.get(tag)
+    if canonical is None:
+        return val
+
+    return tag, canonical(cpool, data)
 
-    elif left_tag == '[':
-        if len(left_data) != len(right_data):
-            return False
 
-        for index in range(0, len(left_data)):
-            ld = left_data[index]
-            rd = right_data[index]
-            if not _annotation_val_eq(ld[0], ld[1], left_cpool,
-                                      rd[0], rd[1], right_cpool):
-                return False
-        return True
+def _canonical_annotation_const(cpool, data):
+    return cpool.deref_const(data)
+
+
+def _canonical_annotation_enum(cpool, data):
+    deref = cpool.deref_const
+    return (deref(data[0]), deref(data[1]))
+
+
+def _canonical_annotation_nested(_cpool, data):
+    return data._canonical()
+
+
+def _canonical_annotation_array(cpool, data):
+    return tuple([_canonical_annotation_val(v, cpool) for v in data])
+
+
+# dispatch table for _canonical_annotation_val, keyed by element
+# value tag
+_canonical_annotation_handlers = dict.fromkeys(
+    "BCDFIJSZsc", _canonical_annotation_const)
+_canonical_annotation_handlers.update({
+    "e": _canonical_annotation_enum,
+    "@": _canonical_annotation_nested,
+    "[": _canonical_annotation_array,
+})
 
 
 def _unpack_annotation_val(unpacker, cpool):
@@ -2020,32 +2354,62 @@ def _unpack_annotation_val(unpacker, cpool):
     tag, data tuple of an annotation
     """
 
-    tag, = unpacker.unpack_struct(_B)
-    tag = chr(tag)
+    vals = list()
+    _unpack_annotation_vals(unpacker, cpool, vals, 1)
+    return vals[0]
 
-    if tag in 'BCDFIJSZs':
-        data, = unpacker.unpack_struct(_H)
 
-    elif tag == 'e':
-        data = unpacker.unpack_struct(_HH)
+def _unpack_annotation_vals(unpacker, cpool, into, count):
+    """
+    unpacks count annotation values into either a list, in order, or a
+    JavaAnnotation, keyed by their element names
+    """
 
-    elif tag == 'c':
-        data, = unpacker.unpack_struct(_H)
+    unpack_struct = unpacker.unpack_struct
+    deref = cpool.deref_const
 
-    elif tag == '@':
-        data = JavaAnnotation(cpool)
-        data.unpack(unpacker)
+    # rather than recursing into nested arrays and annotations, each
+    # container still being filled is kept on a stack along with how
+    # many more values it needs and whether they are keyed
+    stack = [[into, count, isinstance(into, JavaAnnotation)]]
 
-    elif tag == '[':
-        data = list()
-        count, = unpacker.unpack_struct(_H)
-        for _i in range(0, count):
-            data.append(_unpack_annotation_val(unpacker, cpool))
+    while stack:
+        frame = stack[-1]
+        into, count, keyed = frame
+        if not count:
+            stack.pop()
+            continue
+        frame[1] = count - 1
 
-    else:
-        raise Unimplemented("Unknown tag {}".format(tag))
+        if keyed:
+            key_ref, = unpack_struct(_H)
+
+        tag, = unpack_struct(_B)
+        tag = chr(tag)
+
+        if tag in 'BCDFIJSZsc':
+            data, = unpack_struct(_H)
 
-    return tag, data
+        elif tag == 'e':
+            data = unpack_struct(_HH)
+
+        elif tag == '@':
+            data = JavaAnnotation(cpool)
+            data.type_ref, sub_count = unpack_struct(_HH)
+            stack.append([data, sub_count, True])
+
+        elif tag == '[':
+            data = list()
+            sub_count, = unpack_struct(_H)
+            stack.append([data, sub_count, False])
+
+        else:
+            raise Unimplemented("Unknown tag {}".format(tag))
+
+        if keyed:
+            into[deref(key_ref)] = (tag, data)
+        else:
+            into.append((tag, data))
 
 
 def _pretty_annotation_val(val, cpool):
@@ -2094,6 +2458,21 @@ _platforms = (
     ((52, 0), (52, 65535), "1.8"), )
 
 
+def _index_platforms(platforms):
+    """
+    dict mapping each major version to the (min_minor, max_minor,
+    name) ranges of the platforms within it
+    """
+
+    index = dict()
+    for (major, low), (_major, high), name in platforms:
+        index.setdefault(major, []).append((low, high, name))
+    return index
+
+
+_platforms_by_major = _index_platforms(_platforms)
+
+
 def platform_from_version(major, minor):
     """
     returns the minimum platform version that can load the given class
@@ -2101,9 +2480,8 @@ def platform_from_version(major, minor):
     match the given version
     """
 
-    v = (major, minor)
-    for low, high, name in _platforms:
-        if low <= v <= high:
+    for low, high, name in _platforms_by_major.get(major, ()):
+        if low <= minor <= high:
             return name
     return None
 
@@ -2112,6 +2490,67 @@ def platform_from_version(major, minor):
 # Utility functions for the constants pool
 
 
+# struct and whether the value is a single scalar, for each of the
+# fixed-size constant pool types
+_const_item_structs = {
+    CONST_Integer: (compile_struct(">i"), True),
+    CONST_Float: (compile_struct(">f"), True),
+    CONST_Long: (compile_struct(">q"), True),
+    CONST_Double: (compile_struct(">d"), True),
+    CONST_Class: (_H, True),
+    CONST_String: (_H, True),
+    CONST_MethodType: (_H, True),
+    CONST_Module: (_H, True),
+    CONST_Package: (_H, True),
+    CONST_Fieldref: (_HH, False),
+    CONST_Methodref: (_HH, False),
+    CONST_InterfaceMethodref: (_HH, False),
+    CONST_NameAndType: (_HH, False),
+    CONST_ModuleId: (_HH, False),
+    CONST_InvokeDynamic: (_HH, False),
+    CONST_Dynamic: (_HH, False),
+    CONST_MethodHandle: (_BH, False),
+}
+
+
+# Class names and descriptors such as java/lang/Object or ()V appear in
+# nearly every class file. Short Utf8 constants are decoded once and
+# the same string instance shared between every pool that holds them.
+_utf8_cache = dict()
+_UTF8_CACHE_MAXLEN = 64
+_UTF8_CACHE_LIMIT = 2 ** 15
+
+
+def _decode_utf8(val):
+    """
+    decode the bytes of a CONST_Utf8 item
+    """
+
+    result = _utf8_cache.get(val)
+    if result is not None:
+        return result
+
+    data = val
+    if b"\xC0\x80" in data:
+        # easiest hack to handle java's modified utf-8 encoding of
+        # the NUL character, checked for up front rather than after
+        # a failed decode
+        data = data.replace(b"\xC0\x80", b"\x00")
+
+    try:
+        result = data.decode("utf8")
+    except UnicodeDecodeError:
+        # we want at least some data, thus we ignore unknown
+        # characters
+        result = data.decode("utf8", errors="ignore")
+
+    if len(val) <= _UTF8_CACHE_MAXLEN and \
+       len(_utf8_cache) < _UTF8_CACHE_LIMIT:
+        _utf8_cache[val] = result
+
+    return result
+
+
 def _unpack_const_item(unpacker):
     """
     unpack a constant pool item, which will consist of a type byte
@@ -2123,48 +2562,177 @@ def _unpack_const_item(unpacker):
 
     if typecode == CONST_Utf8:
         (slen,) = unpacker.unpack_struct(_H)
-        val = unpacker.read(slen)
-        try:
-            val = val.decode("utf8")
-        except UnicodeDecodeError:
-            # easiest hack to handle java's modified utf-8 encoding
-            # also we want at least some data, thus we ignore
-            # unknown characters
-            val = val.replace(b"\xC0\x80", b"\x00") \
-                     .decode("utf8", errors="ignore")
+        val = _decode_utf8(unpacker.read(slen))
 
-    elif typecode == CONST_Integer:
-        (val,) = unpacker.unpack(">i")
+    elif typecode in _const_item_structs:
+        sfmt, scalar = _const_item_structs[typecode]
+        val = unpacker.unpack_struct(sfmt)
+        if scalar:
+            (val,) = val
 
-    elif typecode == CONST_Float:
-        (val,) = unpacker.unpack(">f")
+    else:
+        raise UnknownConstantPoolTagException(
+            "unknown constant type %r" % typecode)
 
-    elif typecode == CONST_Long:
-        (val,) = unpacker.unpack(">q")
+    return typecode, val
 
-    elif typecode == CONST_Double:
-        (val,) = unpacker.unpack(">d")
 
-    elif typecode in (CONST_Class, CONST_String, CONST_MethodType,
-                      CONST_Module, CONST_Package):
-        (val,) = unpacker.unpack_struct(_H)
+def _unpack_const_buffer(data, offset, count):
+    """
+    unpack count constant pool items (counted the same way as the
+    constant_pool_count of a class file) directly from data, starting
+    at offset. Returns a tuple of the types as a bytearray, the list of
+    values, and the offset immediately after the last item.
+    """
 
-    elif typecode in (CONST_Fieldref, CONST_Methodref,
-                      CONST_InterfaceMethodref, CONST_NameAndType,
-                      CONST_ModuleId, CONST_InvokeDynamic, CONST_Dynamic):
-        val = unpacker.unpack_struct(_HH)
+    # first item is never present in the actual data buffer, but
+    # the count number acts like it would be.
+    tags = bytearray(1)
+    vals = [None]
+    add_tag = tags.append
+    add_val = vals.append
 
-    elif typecode == CONST_MethodHandle:
-        val = unpacker.unpack_struct(_BH)
+    structs = _const_item_structs
+    utf8_get = _utf8_cache.get
+    as_bytes = memoryview.tobytes if isinstance(data, memoryview) else bytes
+    size = len(data)
+    sfmt = _B
 
-    elif typecode == CONST_MethodType:
-        val = unpacker.unpack_struct(_H)
+    try:
+        i = 1
+        while i < count:
+            sfmt = _B
+            (typecode,) = _B.unpack_from(data, offset)
+            offset += 1
+
+            if typecode == CONST_Utf8:
+                sfmt = _H
+                (slen,) = _H.unpack_from(data, offset)
+                offset += 2
+
+                end = offset + slen
+                if end > size:
+                    raise UnpackException(None, slen, size - offset)
+
+                # most names are already in the cache, so look there
+                # before paying for the call to decode
+                raw = as_bytes(data[offset:end])
+                val = utf8_get(raw)
+                if val is None:
+                    val = _decode_utf8(raw)
+                offset = end
+
+            elif typecode in structs:
+                sfmt, scalar = structs[typecode]
+                val = sfmt.unpack_from(data, offset)
+                offset += sfmt.size
+                if scalar:
+                    (val,) = val
 
-    else:
-        raise UnknownConstantPoolTagException(
-            "unknown constant type %r" % typecode)
+            else:
+                raise UnknownConstantPoolTagException(
+                    "unknown constant type %r" % typecode)
 
-    return typecode, val
+            add_tag(typecode)
+            add_val(val)
+            i += 1
+
+            # Long and Double const types will "consume" an item
+            # count, but not data
+            if typecode == CONST_Long or typecode == CONST_Double:
+                if i < count:
+                    add_tag(0)
+                    add_val(None)
+                i += 1
+
+    except StructError:
+        raise UnpackException(sfmt.format, sfmt.size, size - offset)
+
+    return tags, vals, offset
+
+
+def _pretty_deref_value(_cpool, val):
+    return val
+
+
+def _pretty_deref_string(cpool, val):
+    return cpool.deref_const(val)
+
+
+def _pretty_deref_class(cpool, val):
+    return cpool.deref_const(val).replace("/", ".")
+
+
+def _pretty_deref_fieldref(cpool, val):
+    deref = cpool.deref_const
+    cn = deref(val[0]).replace("/", ".")
+    n, t = deref(val[1])
+    return "%s.%s:%s" % (cn, n, _pretty_type(t))
+
+
+def _pretty_deref_methodref(cpool, val):
+    deref = cpool.deref_const
+    cn = deref(val[0]).replace("/", ".")
+    n, t = deref(val[1])
+    args, ret = _pretty_typeseq(t)
+    return "%s.%s%s:%s" % (cn, n, args, ret)
+
+
+def _pretty_deref_nameandtype(cpool, val):
+    deref = cpool.deref_const
+    b = "".join(_pretty_typeseq(deref(val[1])))
+    return "%s:%s" % (deref(val[0]), b)
+
+
+def _pretty_deref_moduleid(cpool, val):
+    deref = cpool.deref_const
+    return "%s@%s" % (deref(val[0]), deref(val[1]))
+
+
+def _pretty_deref_invokedynamic(cpool, val):
+    # TODO: val[0] needs to come from the bootstrap methods table
+    return "InvokeDynamic %r %r" % (val[0], cpool.deref_const(val[1]))
+
+
+def _pretty_deref_dynamic(cpool, val):
+    # TODO: val[0] needs to come from the bootstrap methods table
+    return "Dynamic %r %r" % (val[0], cpool.deref_const(val[1]))
+
+
+def _pretty_deref_methodtype(cpool, val):
+    # val is the single index of the method descriptor
+    return "MethodType %r" % cpool.deref_const(val)
+
+
+def _pretty_deref_module(cpool, val):
+    return "Module %s" % cpool.deref_const(val)
+
+
+def _pretty_deref_package(cpool, val):
+    return "Package %s" % cpool.deref_const(val)
+
+
+# dispatch table for JavaConstantPool.pretty_deref_const, keyed by
+# constant pool type
+_pretty_deref_handlers = {
+    CONST_Utf8: _pretty_deref_value,
+    CONST_Integer: _pretty_deref_value,
+    CONST_Float: _pretty_deref_value,
+    CONST_Long: _pretty_deref_value,
+    CONST_Double: _pretty_deref_value,
+    CONST_String: _pretty_deref_string,
+    CONST_Class: _pretty_deref_class,
+    CONST_Fieldref: _pretty_deref_fieldref,
+    CONST_Methodref: _pretty_deref_methodref,
+    CONST_InterfaceMethodref: _pretty_deref_methodref,
+    CONST_NameAndType: _pretty_deref_nameandtype,
+    CONST_ModuleId: _pretty_deref_moduleid,
+    CONST_InvokeDynamic: _pretty_deref_invokedynamic,
+    CONST_Dynamic: _pretty_deref_dynamic,
+    CONST_MethodType: _pretty_deref_methodtype,
+    CONST_Module: _pretty_deref_module,
+    CONST_Package: _pretty_deref_package,
+}
 
 
 def _pretty_const_type_val(typecode, val):
@@ -2284,14 +2852,40 @@ def _next_argsig(s):
     return result
 
 
+# a single well-formed type signature, with any array dimensions
+_typeseq_match = re.compile(r"\[*(?:[BCDFIJSVZ]|L[^;]*;|\([^)]*\))").match
+
+
 def _typeseq_iter(s):
     """
     iterate through all of the type signatures in a sequence
     """
 
-    original = s
+    s = str(s)
+    end = len(s)
+    pos = 0
+
+    while pos < end:
+        found = _typeseq_match(s, pos)
+        if found is None:
+            break
+        pos = found.end()
+        yield found.group()
+
+    if pos < end:
+        # whatever the tokenizer couldn't handle is walked piecewise,
+        # which skips or reports malformed signatures
+        for t in _typeseq_walk(s[pos:], s):
+            yield t
+
+
+def _typeseq_walk(s, original):
+    """
+    iterate through the type signatures in s one _next_argsig at a
+    time
+    """
+
     try:
-        s = str(s)
         while s:
             old_s = s
             t, s = _next_argsig(s)
@@ -2322,63 +2916,81 @@ def _typeseq(type_s):
     return tuple(_typeseq_iter(type_s))
 
 
+# Type descriptors such as Ljava/lang/String; repeat constantly within
+# and between class files, so their pretty versions are kept once
+# computed.
+_pretty_type_cache = dict()
+_pretty_typeseq_cache = dict()
+_PRETTY_CACHE_LIMIT = 2 ** 14
+
+
 def _pretty_typeseq(type_s):
     """
-    iterator of pretty versions of _typeseq_iter
+    tuple of pretty versions of _typeseq_iter
     """
 
-    return (_pretty_type(t) for t in _typeseq(type_s))
+    result = _pretty_typeseq_cache.get(type_s)
+    if result is None:
+        result = tuple(_pretty_type(t) for t in _typeseq(type_s))
+        if len(_pretty_typeseq_cache) < _PRETTY_CACHE_LIMIT:
+            _pretty_typeseq_cache[type_s] = result
 
+    return result
 
-def _pretty_type(s, offset=0):
-    # pylint: disable=R0911, R0912
-    # too many returns, too many branches. Not converting this to a
-    # dict lookup. Waiving instead.
 
+def _pretty_type(s, offset=0):
     """
     returns the pretty version of a type code
     """
 
-    tc = s[offset]
-
-    if tc == "V":
-        return "void"
+    if offset:
+        s = s[offset:]
 
-    elif tc == "Z":
-        return "boolean"
+    result = _pretty_type_cache.get(s)
+    if result is None:
+        result = _pretty_type_uncached(s)
+        if len(_pretty_type_cache) < _PRETTY_CACHE_LIMIT:
+            _pretty_type_cache[s] = result
 
-    elif tc == "C":
-        return "char"
+    return result
 
-    elif tc == "B":
-        return "byte"
 
-    elif tc == "S":
-        return "short"
+# pretty names of the primitive type codes
+_pretty_primitives = {
+    "V": "void",
+    "Z": "boolean",
+    "C": "char",
+    "B": "byte",
+    "S": "short",
+    "I": "int",
+    "J": "long",
+    "D": "double",
+    "F": "float",
+}
 
-    elif tc == "I":
-        return "int"
 
-    elif tc == "J":
-        return "long"
+def _pretty_type_uncached(s):
+    """
+    the uncached implementation of _pretty_type
+    """
 
-    elif tc == "D":
-        return "double"
+    tc = s[0]
 
-    elif tc == "F":
-        return "float"
+    result = _pretty_primitives.get(tc)
+    if result is not None:
+        return result
 
     elif tc == "L":
-        return _pretty_class(s[offset + 1:-1])
+        return s[1:-1].replace("/", ".")
 
     elif tc == "[":
-        return "%s[]" % _pretty_type(s, offset + 1)
+        return "%s[]" % _pretty_type(s, 1)
 
     elif tc == "(":
-        return "(%s)" % ",".join(_pretty_typeseq(s[offset + 1:-1]))
+        return "(%s)" % ",".join(_pretty_typeseq(s[1:-1]))
 
     elif tc == "T":
-        return "generic " + s[offset + 1:]
+        return "generic " + s[1:]
 
     else:
         raise Unimplemented("unknown type, %r" % tc)
@@ -2398,6 +3010,36 @@ def _pretty_class(s):
 # Functions for dealing with buffers and files
 
 
+def _as_bytes(data):
+    """
+    the given bytes, buffer, or memoryview as bytes. On py2 bytes() of
+    a memoryview would give its repr rather than its contents.
+    """
+
+    if isinstance(data, memoryview):
+        return data.tobytes()
+    else:
+        return bytes(data)
+
+
+def _magic_as_int(magic):
+    """
+    the given magic bytes (as bytes, a buffer, a str, or a sequence of
+    ints) as a single big-endian u4, or None if there are not exactly
+    four of them
+    """
+
+    if isinstance(magic, text_type):
+        magic = magic.encode("latin1", "replace")
+
+    magic = bytearray(magic)
+    if len(magic) != 4:
+        return None
+
+    (value,) = _I.unpack_from(magic)
+    return value
+
+
 def is_class(data):
     """
     checks that the data (which is a string, buffer, or a stream
@@ -2406,14 +3048,10 @@ def is_class(data):
     match, or for any errors.
     """
 
-    try:
-        with unpack(data) as up:
-            magic = up.unpack_struct(_BBBB)
-
-        return magic == JAVA_CLASS_MAGIC
+    if hasattr(data, "read"):
+        data = data.read(4)
 
-    except UnpackException:
-        return False
+    return _as_bytes(data[:4]) == JAVA_CLASS_MAGIC_BYTES
 
 
 def is_class_file(filename):
@@ -2423,10 +3061,7 @@ def is_class_file(filename):
     """
 
     with open(filename, "rb") as fd:
-        c = fd.read(len(JAVA_CLASS_MAGIC))
-        if isinstance(c, str):      # Python 2
-            c = map(ord, c)
-        return tuple(c) == JAVA_CLASS_MAGIC
+        return fd.read(4) == JAVA_CLASS_MAGIC_BYTES
 
 
 def unpack_class(data, magic=None):
@@ -2445,11 +3080,12 @@ def unpack_class(data, magic=None):
     which isn't understood by javatools yet.
     """
 
-    with unpack(data) as up:
-        magic = magic or up.unpack_struct(_BBBB)
-        if magic != JAVA_CLASS_MAGIC:
-            raise ClassUnpackException("Not a Java class file")
+    if hasattr(data, "read"):
+        # class files are small, so rather than reading from the
+        # stream piecemeal we'll buffer the whole thing up front
+        data = data.read()
 
+    with unpack(data) as up:
         o = JavaClassInfo()
         o.unpack(up, magic=magic)
 
@@ -2464,7 +3100,7 @@ def unpack_classfile(filename):
     """
 
     with open(filename, "rb", _BUFFERING) as fd:
-        return unpack_class(fd.read())
+        return unpack_class(fd)
 
 
 #
@@ -28,7 +28,7 @@ from functools import wraps
 __all__ = (
     "squash",
     "collect_by_typename", "collect_by_type",
-    "iterate_by_type", "yield_sorted_by_type",
+    "iterate_by_type", "list_by_type", "yield_sorted_by_type",
     "Change", "Addition", "Removal",
     "GenericChange", "SuperChange",
     "SquashedChange", "SquashedAddition", "SquashedRemoval", )
@@ -44,14 +44,17 @@ def collect_by_typename(obj_sequence, cache=None):
     if cache is None:
         cache = {}
 
-    for val in obj_sequence:
-        key = type(val).__name__
+    # changes tend to arrive in runs of the same type, so keep the
+    # bucket for the last type seen rather than looking it up again
+    last_type = None
+    bucket = None
 
-        bucket = cache.get(key, None)
-        if bucket is not None:
-            bucket.append(val)
-        else:
-            cache[key] = [val]
+    for val in obj_sequence:
+        val_type = type(val)
+        if val_type is not last_type:
+            last_type = val_type
+            bucket = cache.setdefault(val_type.__name__, [])
+        bucket.append(val)
 
     return cache
 
@@ -65,14 +68,16 @@ def collect_by_type(obj_sequence, cache=None):
     if cache is None:
         cache = {}
 
-    for val in obj_sequence:
-        key = type(val)
+    # see collect_by_typename
+    last_type = None
+    bucket = None
 
-        bucket = cache.get(key, None)
-        if bucket is not None:
-            bucket.append(val)
-        else:
-            cache[key] = [val]
+    for val in obj_sequence:
+        val_type = type(val)
+        if val_type is not last_type:
+            last_type = val_type
+            bucket = cache.setdefault(val_type, [])
+        bucket.append(val)
 
     return cache
 
@@ -87,9 +92,11 @@ def iterate_by_type(objs, typelist):
     """
 
     cache = collect_by_type(objs)
+    cache_pop = cache.pop
+    empty = ()
 
     for t in typelist:
-        for val in cache.pop(t, tuple()):
+        for val in cache_pop(t, empty):
             yield val
 
     for tl in cache.values():
@@ -97,13 +104,36 @@ def iterate_by_type(objs, typelist):
             yield val
 
 
+def list_by_type(objs, typelist):
+    """
+    as iterate_by_type, but returns the objs as a list in a single pass
+    rather than re-emitting them from a generator
+    """
+
+    cache = collect_by_type(objs)
+    cache_pop = cache.pop
+    empty = ()
+
+    result = []
+    extend = result.extend
+
+    for t in typelist:
+        extend(cache_pop(t, empty))
+
+    for tl in cache.values():
+        extend(tl)
+
+    return result
+
+
 def yield_sorted_by_type(*typelist):
     """
     a useful decorator for the collect_impl method of SuperChange
-    subclasses. Caches the yielded changes, and re-emits them
-    collected by their type. The order of the types can be specified
-    by listing the types as arguments to this decorator. Unlisted
-    types will be yielded last in no guaranteed order.
+    subclasses. Collects the yielded changes, and returns them as a
+    list grouped by their type. The order of the types can be
+    specified by listing the types as arguments to this
+    decorator. Unlisted types will be placed last in no guaranteed
+    order.
 
     Grouping happens by exact type match only. Inheritance is not
     taken into consideration for grouping.
@@ -112,7 +142,7 @@ def yield_sorted_by_type(*typelist):
     def decorate(fun):
         @wraps(fun)
         def decorated(*args, **kwds):
-            return iterate_by_type(fun(*args, **kwds), typelist)
+            return list_by_type(fun(*args, **kwds), typelist)
         return decorated
 
     return decorate
@@ -121,11 +151,23 @@ def yield_sorted_by_type(*typelist):
 class Change(object):
     """
     Base class for representing a specific change between two objects
+
+    Changes do not clear themselves when collected. Callers which are
+    done with a change tree should call clear on its root to drop the
+    references to the compared data and to the child changes.
     """
 
     label = "Change"
 
 
+    # overridden by Addition and Removal
+    is_addition = False
+    is_removal = False
+
+
+    __slots__ = ("ldata", "rdata", "description", "changed", "entry")
+
+
     def __init__(self, ldata, rdata):
         self.ldata = ldata
         self.rdata = rdata
@@ -134,11 +176,12 @@ class Change(object):
         self.entry = None
 
 
-    def __del__(self):
-        self.clear()
-
-
     def clear(self):
+        """
+        drops references to the compared data. Safe to call more than
+        once.
+        """
+
         self.ldata = None
         self.rdata = None
         self.description = None
@@ -147,7 +190,12 @@ class Change(object):
 
 
     def check(self):
-        pass
+        """
+        performs the comparison between the left and right data, and
+        returns the result of is_change
+        """
+
+        return self.is_change()
 
 
     def get_ldata(self):
@@ -196,10 +244,10 @@ class Change(object):
         if options:
             simple["is_ignored"] = self.is_ignored(options)
 
-        if isinstance(self, Addition):
+        if self.is_addition:
             simple["is_addition"] = True
 
-        if isinstance(self, Removal):
+        if self.is_removal:
             simple["is_removal"] = True
 
         if self.entry:
@@ -214,6 +262,10 @@ class Removal(Change):
     """
 
     label = "Removal"
+    is_removal = True
+
+
+    __slots__ = ()
 
 
     def is_change(self):
@@ -226,6 +278,10 @@ class Addition(Change):
     """
 
     label = "Addition"
+    is_addition = True
+
+
+    __slots__ = ()
 
 
     def is_change(self):
@@ -242,6 +298,9 @@ class GenericChange(Change):
     label = "Generic Change"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, side_data):
         """
         Get the data to be used in fn_differ from side_data. By default,
@@ -272,10 +331,11 @@ class GenericChange(Change):
     def fn_differ(self, left_data, right_data):
         """
         override to provide the check for whether get_ldata() and
-        get_rdata() differ. defaults to an inequality (!=) check
+        get_rdata() differ. defaults to an inequality (!=) check, which
+        is skipped when both sides are the same object
         """
 
-        return left_data != right_data
+        return left_data is not right_data and left_data != right_data
 
 
     def get_ldata(self):
@@ -355,10 +415,11 @@ class GenericChange(Change):
     def check(self):
         """
         if necessary, override check_impl to change the behaviour of
-        subclasses of GenericChange.
+        subclasses of GenericChange. Returns the result of is_change
         """
 
         self.changed, self.description = self.check_impl()
+        return self.is_change()
 
 
     def simplify(self, options=None):
@@ -393,6 +454,11 @@ class SuperChange(GenericChange):
     with. The check_impl (called from check) will iterate over the
     instances and call their check method in-turn.
 
+    Once checked, a SuperChange with children drops its references to
+    the left and right data, which its children already hold. Set the
+    retain_data class field to True in subclasses which still need
+    that data afterwards, eg. for their description or report.
+
     An instance of SuperChange is considered unchanged if all of its
     sub-changes are also unchanged (or if there were no sub-changes).
 
@@ -407,9 +473,18 @@ class SuperChange(GenericChange):
     change_types = tuple()
 
 
+    # override to keep ldata and rdata after check
+    retain_data = False
+
+
+    __slots__ = ("changes", "_collected", "_ignored")
+
+
     def __init__(self, ldata, rdata):
         super(SuperChange, self).__init__(ldata, rdata)
         self.changes = tuple()
+        self._collected = False
+        self._ignored = None
 
 
     def fn_pretty(self, c):
@@ -426,6 +501,8 @@ class SuperChange(GenericChange):
         for c in self.changes:
             c.clear()
         self.changes = tuple()
+        self._collected = False
+        self._ignored = None
 
 
     def collect_impl(self):
@@ -437,8 +514,8 @@ class SuperChange(GenericChange):
         ldata = self.get_ldata()
         rdata = self.get_rdata()
 
-        for change_type in self.change_types:
-            yield change_type(ldata, rdata)
+        return tuple([change_type(ldata, rdata)
+                      for change_type in self.change_types])
 
 
     def collect(self, force=False):
@@ -446,11 +523,14 @@ class SuperChange(GenericChange):
         calls collect_impl and stores the results as the child changes of
         this super-change. Returns a tuple of the data generated from
         collect_impl. Caches the result rather than re-computing each
-        time, unless force is True
+        time, unless force is True. A collection which produced no
+        changes is cached as well.
         """
 
-        if force or not self.changes:
+        if force or not (self._collected or self.changes):
             self.changes = tuple(self.collect_impl())
+            self._collected = True
+            self._ignored = None
         return self.changes
 
 
@@ -461,20 +541,49 @@ class SuperChange(GenericChange):
         True,None
         """
 
+        self._ignored = None
+
         c = False
         for change in self.collect():
-            change.check()
-            c = c or change.is_change()
+            c = change.check() or c
         return c, None
 
 
+    def check(self):
+        """
+        checks the child changes, then releases the left and right data
+        unless retain_data is set
+        """
+
+        c = super(SuperChange, self).check()
+
+        # if the children were never collected, a later collect
+        # would need the data again
+        if self._collected and not self.retain_data:
+            self.ldata = None
+            self.rdata = None
+
+        return c
+
+
     def is_ignored(self, options):
         """
         If we have changed children and all the children which are changes
         are ignored, then we are ignored. Otherwise, we are not
-        ignored
+        ignored. The answer is cached for the most recent options
+        object until this change is re-checked or cleared.
         """
 
+        cached = self._ignored
+        if cached is not None and cached[0] is options:
+            return cached[1]
+
+        result = self._is_ignored(options)
+        self._ignored = (options, result)
+        return result
+
+
+    def _is_ignored(self, options):
         if not self.is_change():
             return False
 
@@ -525,11 +634,15 @@ class SuperChange(GenericChange):
         all child changes into squashed changes
         """
 
-        oldsubs = self.collect()
-        self.changes = tuple(squash(c, options=options) for c in oldsubs)
-
-        for change in oldsubs:
+        squashed = []
+        for change in self.collect():
+            squashed.append(squash(change, options=options))
             change.clear()
+        self.changes = tuple(squashed)
+
+        if not self.retain_data:
+            self.ldata = None
+            self.rdata = None
 
 
 class SquashedChange(Change):
@@ -537,9 +650,12 @@ class SquashedChange(Change):
     For when you want to keep just the overall data from a change,
     including whether it was ignored, but want to discard the more
     in-depth information.
+
+    The label is copied from the original change, and so is stored
+    per instance rather than on the class.
     """
 
-    label = "SquashedChange"
+    __slots__ = ("label", "ignored", "origclass")
 
 
     def __init__(self, change, is_ignored=False):
@@ -576,7 +692,7 @@ class SquashedRemoval(SquashedChange, Removal):
     Squashed change indicating something was removed
     """
 
-    label = "SquashedRemoval"
+    __slots__ = ()
 
 
 class SquashedAddition(SquashedChange, Addition):
@@ -584,7 +700,7 @@ class SquashedAddition(SquashedChange, Addition):
     Squashed change indicating something was added
     """
 
-    label = "SquashedAddition"
+    __slots__ = ()
 
 
 def squash(change, is_ignored=False, options=None):
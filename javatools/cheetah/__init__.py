@@ -22,6 +22,7 @@ license: LGPL
 """
 
 
+from importlib import import_module
 from pkgutil import iter_modules
 
 
@@ -30,17 +31,15 @@ def _iter_templates():
     uses reflection to yield the Cheetah templates under this module
     """
 
-    # pylint: disable=W0406
-    # needed for introspection
-    import javatools.cheetah
     from Cheetah.Template import Template
 
     for _, name, _ in iter_modules(__path__):
         if name == "setuptools":
             continue
 
-        __import__("javatools.cheetah." + name)
-        found = getattr(getattr(javatools.cheetah, name), name)
+        # looked up via import_module rather than as an attribute of
+        # this package, which is still being imported at this point
+        found = getattr(import_module(__name__ + "." + name), name)
         if issubclass(found, Template):
             yield found
 
@@ -50,7 +49,7 @@ def get_templates():
     The Cheetah Template classes contained within this module
     """
 
-    return tuple(_iter_templates())
+    return _templates
 
 
 def xml_entity_escape(data):
@@ -64,5 +63,15 @@ def xml_entity_escape(data):
     return data
 
 
+# the template classes are loaded once, when this package is first
+# imported. This happens after the helpers above are defined, as the
+# templates import them. Cheetah may not be available when the
+# templates are being built, in which case there are none.
+try:
+    _templates = tuple(_iter_templates())
+except ImportError:
+    _templates = ()
+
+
 #
 # The end.
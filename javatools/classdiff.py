@@ -30,16 +30,12 @@ import sys
 from abc import ABCMeta
 from argparse import ArgumentParser, Action
 from six import add_metaclass
+from six.moves import zip_longest
 
 from . import unpack_classfile
 from .change import GenericChange, SuperChange
 from .change import Addition, Removal
-from .change import yield_sorted_by_type
-from .opcodes import get_opname_by_code, has_const_arg
-from .report import quick_report, Reporter
-from .report import JSONReportFormat, TextReportFormat
-from .report import add_general_report_optgroup
-from .report import add_json_report_optgroup, add_html_report_optgroup
+from .opcodes import CONST_ARG_OPS, OPNAMES
 
 
 __all__ = (
@@ -92,6 +88,9 @@ class ClassNameChange(GenericChange):
     label = "Class name"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_this()
 
@@ -105,6 +104,9 @@ class ClassVersionChange(GenericChange):
     label = "Java class verison"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.version
 
@@ -122,6 +124,9 @@ class ClassPlatformChange(GenericChange):
     label = "Java platform"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_platform()
 
@@ -139,6 +144,9 @@ class ClassSuperclassChange(GenericChange):
     label = "Superclass"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_super()
 
@@ -152,8 +160,11 @@ class ClassInterfacesChange(GenericChange):
     label = "Interfaces"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return set(c.get_interfaces())
+        return frozenset(c.get_interfaces())
 
 
     def fn_pretty(self, c):
@@ -165,6 +176,9 @@ class ClassAccessflagsChange(GenericChange):
     label = "Access flags"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.access_flags
 
@@ -178,6 +192,9 @@ class ClassDeprecationChange(GenericChange):
     label = "Deprecation"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.is_deprecated()
 
@@ -191,6 +208,9 @@ class ClassSignatureChange(GenericChange):
     label = "Generics Signature"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_signature()
 
@@ -205,6 +225,9 @@ class AnnotationsChange(GenericChange):
     label = "Runtime annotations"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_annotations() or tuple()
 
@@ -220,6 +243,9 @@ class InvisibleAnnotationsChange(AnnotationsChange):
     label = "Runtime Invisible annotations"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_invisible_annotations() or tuple()
 
@@ -229,16 +255,25 @@ class ClassAnnotationsChange(AnnotationsChange):
     label = "Class runtime annotations"
 
 
+    __slots__ = ()
+
+
 class ClassInvisibleAnnotationsChange(InvisibleAnnotationsChange):
 
     label = "Class runtime invisible annotations"
 
 
+    __slots__ = ()
+
+
 class ClassInfoChange(SuperChange):
 
     label = "Class information"
 
 
+    __slots__ = ()
+
+
     change_types = (ClassNameChange,
                     ClassVersionChange,
                     ClassPlatformChange,
@@ -256,6 +291,10 @@ class MemberSuperChange(SuperChange):
     """
 
     label = "Member"
+    retain_data = True
+
+
+    __slots__ = ()
 
 
     def get_description(self):
@@ -271,6 +310,9 @@ class MemberAdded(Addition):
     label = "Member added"
 
 
+    __slots__ = ()
+
+
     def get_description(self):
         return "%s: %s" % (self.label, self.rdata.pretty_descriptor())
 
@@ -284,6 +326,9 @@ class MemberRemoved(Removal):
     label = "Member removed"
 
 
+    __slots__ = ()
+
+
     def get_description(self):
         return "%s: %s" % (self.label, self.ldata.pretty_descriptor())
 
@@ -301,24 +346,35 @@ class ClassMembersChange(SuperChange):
     member_changed = MemberSuperChange
 
 
+    __slots__ = ()
+
+
     def collect_impl(self):
-        li = {}
+        """
+        the added members, then the removed members, then the members
+        present on both sides, each in the order they were found
+        """
+
+        li = {member.get_identifier(): member for member in self.ldata}
 
-        for member in self.ldata:
-            li[member.get_identifier()] = member
+        # matched members are popped, leaving only the removed ones
+        li_pop = li.pop
+
+        added = []
+        changed = []
 
         for member in self.rdata:
-            key = member.get_identifier()
-            lf = li.get(key, None)
+            lf = li_pop(member.get_identifier(), None)
 
-            if lf:
-                del li[key]
-                yield self.member_changed(lf, member)
+            if lf is not None:
+                changed.append(self.member_changed(lf, member))
             else:
-                yield self.member_added(None, member)
+                added.append(self.member_added(None, member))
+
+        removed = [self.member_removed(member, None)
+                   for member in li.values()]
 
-        for member in li.values():
-            yield self.member_removed(member, None)
+        return added + removed + changed
 
 
 class CodeAbsoluteLinesChange(GenericChange):
@@ -326,8 +382,11 @@ class CodeAbsoluteLinesChange(GenericChange):
     label = "Absolute line numbers"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return (c and c.get_linenumbertable()) or tuple()
+        return c.get_linenumbertable() if c is not None else ()
 
 
     def is_ignored(self, options):
@@ -340,8 +399,11 @@ class CodeRelativeLinesChange(GenericChange):
     label = "Relative line numbers"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return (c and c.get_relativelinenumbertable()) or tuple()
+        return c.get_relativelinenumbertable() if c is not None else ()
 
 
     def is_ignored(self, options):
@@ -354,8 +416,11 @@ class CodeStackChange(GenericChange):
     label = "Stack size"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return (c and c.max_stack) or 0
+        return c.max_stack if c is not None else 0
 
 
 
@@ -364,8 +429,11 @@ class CodeLocalsChange(GenericChange):
     label = "Locals"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return (c and c.max_locals) or 0
+        return c.max_locals if c is not None else 0
 
 
 class CodeExceptionChange(GenericChange):
@@ -373,17 +441,17 @@ class CodeExceptionChange(GenericChange):
     label = "Exception table"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
-        return (c and c.exceptions) or tuple()
+        return c.exceptions if c is not None else ()
 
 
     def fn_pretty(self, c):
-        a = list()
-        for e in self.fn_data(c):
-            p = (e.start_pc, e.end_pc,
-                 e.handler_pc, e.pretty_catch_type())
-            a.append(p)
-        return repr(a)
+        return repr([(e.start_pc, e.end_pc,
+                      e.handler_pc, e.pretty_catch_type())
+                     for e in self.fn_data(c)])
 
 
 class CodeConstantsChange(GenericChange):
@@ -403,10 +471,17 @@ class CodeConstantsChange(GenericChange):
     label = "Code constants"
 
 
+    __slots__ = ("offsets", "body_changed")
+
+
     def __init__(self, lcode, rcode):
         super(CodeConstantsChange, self).__init__(lcode, rcode)
         self.offsets = None
 
+        # whether the offsets and opcodes of the two bodies differ,
+        # once check_impl has walked them
+        self.body_changed = None
+
 
     def fn_pretty(self, c):
         if not self.offsets:
@@ -415,10 +490,9 @@ class CodeConstantsChange(GenericChange):
         pr = list()
 
         for offset, code, args in c.disassemble():
-            if offset in self.offsets and has_const_arg(code):
-                name = get_opname_by_code(code)
+            if offset in self.offsets and code in CONST_ARG_OPS:
                 data = c.cpool.pretty_deref_const(args[0])
-                pr.append((offset, name, data))
+                pr.append((offset, OPNAMES[code], data))
 
         return pr
 
@@ -435,22 +509,38 @@ class CodeConstantsChange(GenericChange):
             # code body change, can't determine constants
             return True, None
 
+        if left.code == right.code:
+            # identical bytes mean identical offsets, opcodes and
+            # arguments. Only the constants they refer to can differ,
+            # and they can't if the pools are the same.
+            self.body_changed = False
+            if left.cpool == right.cpool:
+                self.offsets = offsets
+                return False, None
+
+        lderef = left.cpool.deref_const
+        rderef = right.cpool.deref_const
+
         for l, r in zip(left.disassemble(), right.disassemble()):
             if not ((l[0] == r[0]) and (l[1] == r[1])):
                 # code body change, can't determine constants
+                self.body_changed = True
                 return True, None
 
             largs = l[2]
             rargs = r[2]
 
-            if has_const_arg(l[1]):
-                largs, rargs = list(largs), list(rargs)
-                largs[0] = left.cpool.deref_const(largs[0])
-                rargs[0] = right.cpool.deref_const(rargs[0])
+            if l[1] in CONST_ARG_OPS:
+                # compare the constant the first argument refers to,
+                # rather than its index, and the rest as-is
+                if (lderef(largs[0]) != rderef(rargs[0]) or
+                        largs[1:] != rargs[1:]):
+                    offsets.append(l[0])
 
-            if largs != rargs:
+            elif largs != rargs:
                 offsets.append(l[0])
 
+        self.body_changed = False
         self.offsets = offsets
         return bool(self.offsets), None
 
@@ -464,17 +554,24 @@ class CodeBodyChange(GenericChange):
     label = "Code body"
 
 
+    __slots__ = ("constants",)
+
+
+    def __init__(self, lcode, rcode):
+        super(CodeBodyChange, self).__init__(lcode, rcode)
+
+        # a CodeConstantsChange on the same code, which may already
+        # have compared the offsets and opcodes of the two bodies
+        self.constants = None
+
+
     def fn_data(self, c):
-        return (c and c.disassemble()) or tuple()
+        return c.disassemble() if c is not None else ()
 
 
     def fn_pretty(self, c):
-        pr = list()
-        for offset, code, args in self.fn_data(c):
-            name = get_opname_by_code(code)
-            pr.append((offset, name, args))
-
-        return pr
+        return [(offset, OPNAMES[code], args)
+                for offset, code, args in self.fn_data(c)]
 
 
     def check_impl(self):
@@ -489,6 +586,13 @@ class CodeBodyChange(GenericChange):
                    (len(left.code), len(right.code))
             return True, desc
 
+        constants = self.constants
+        if constants is not None and constants.body_changed is not None:
+            return constants.body_changed, None
+
+        if left.code == right.code:
+            return False, None
+
         for l, r in zip(left.disassemble(), right.disassemble()):
             if not ((l[0] == r[0]) and (l[1] == r[1])):
                 return True, None
@@ -501,6 +605,9 @@ class MethodNameChange(GenericChange):
     label = "Method name"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_name()
 
@@ -510,6 +617,9 @@ class MethodTypeChange(GenericChange):
     label = "Method type"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_type_descriptor()
 
@@ -523,6 +633,9 @@ class MethodSignatureChange(GenericChange):
     label = "Method generic signature"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_signature()
 
@@ -536,6 +649,9 @@ class MethodParametersChange(GenericChange):
     label = "Method parameters"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_arg_type_descriptors()
 
@@ -549,6 +665,9 @@ class MethodAccessflagsChange(GenericChange):
     label = "Method accessflags"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.access_flags
 
@@ -562,6 +681,9 @@ class MethodAbstractChange(GenericChange):
     label = "Method abstract"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return not c.get_code()
 
@@ -578,6 +700,9 @@ class MethodExceptionsChange(GenericChange):
     label = "Method exceptions"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_exceptions()
 
@@ -589,6 +714,10 @@ class MethodExceptionsChange(GenericChange):
 class MethodCodeChange(SuperChange):
 
     label = "Method Code"
+    retain_data = True
+
+
+    __slots__ = ()
 
 
     change_types = (CodeAbsoluteLinesChange,
@@ -610,8 +739,19 @@ class MethodCodeChange(SuperChange):
 
         if self.ldata is self.rdata is None:
             return tuple()
-        else:
-            return super(MethodCodeChange, self).collect_impl()
+
+        changes = super(MethodCodeChange, self).collect_impl()
+
+        # the constants check is made first, and walks the same
+        # opcodes as the body check. Let the body check reuse that.
+        constants = None
+        for change in changes:
+            if isinstance(change, CodeConstantsChange):
+                constants = change
+            elif isinstance(change, CodeBodyChange):
+                change.constants = constants
+
+        return changes
 
 
     def check_impl(self):
@@ -629,6 +769,9 @@ class MethodDeprecationChange(GenericChange):
     label = "Method deprecation"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.is_deprecated()
 
@@ -642,16 +785,25 @@ class MethodAnnotationsChange(AnnotationsChange):
     label = "Method runtime annotations"
 
 
+    __slots__ = ()
+
+
 class MethodInvisibleAnnotationsChange(InvisibleAnnotationsChange):
 
     label = "Method runtime invisible annotations"
 
 
+    __slots__ = ()
+
+
 class MethodChange(MemberSuperChange):
 
     label = "Method"
 
 
+    __slots__ = ()
+
+
     change_types = (MethodNameChange,
                     MethodTypeChange,
                     MethodSignatureChange,
@@ -670,6 +822,9 @@ class FieldNameChange(GenericChange):
     label = "Field name"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_name()
 
@@ -679,6 +834,9 @@ class FieldTypeChange(GenericChange):
     label = "Field type"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_descriptor()
 
@@ -692,6 +850,9 @@ class FieldSignatureChange(GenericChange):
     label = "Field Generic Signature"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.get_signature()
 
@@ -705,6 +866,9 @@ class FieldAccessflagsChange(GenericChange):
     label = "Field accessflags"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.access_flags
 
@@ -722,6 +886,9 @@ class FieldConstvalueChange(GenericChange):
     label = "Field constvalue"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.deref_constantvalue()
 
@@ -735,6 +902,9 @@ class FieldDeprecationChange(GenericChange):
     label = "Field deprecation"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.is_deprecated()
 
@@ -748,16 +918,25 @@ class FieldAnnotationsChange(AnnotationsChange):
     label = "Field runtime annotations"
 
 
+    __slots__ = ()
+
+
 class FieldInvisibleAnnotationsChange(InvisibleAnnotationsChange):
 
     label = "Field runtime invisible annotations"
 
 
+    __slots__ = ()
+
+
 class FieldChange(MemberSuperChange):
 
     label = "Field"
 
 
+    __slots__ = ()
+
+
     change_types = (FieldNameChange,
                     FieldTypeChange,
                     FieldSignatureChange,
@@ -773,26 +952,30 @@ class FieldAdded(MemberAdded):
     label = "Field added"
 
 
+    __slots__ = ()
+
+
 class FieldRemoved(MemberRemoved):
 
     label = "Field removed"
 
 
+    __slots__ = ()
+
+
 class ClassFieldsChange(ClassMembersChange):
 
     label = "Fields"
 
 
+    __slots__ = ()
+
+
     member_added = FieldAdded
     member_removed = FieldRemoved
     member_changed = FieldChange
 
 
-    @yield_sorted_by_type(FieldAdded, FieldRemoved, FieldChange)
-    def collect_impl(self):
-        return super(ClassFieldsChange, self).collect_impl()
-
-
     def __init__(self, lclass, rclass):
         super(ClassFieldsChange, self).__init__(lclass.fields,
                                                 rclass.fields)
@@ -803,26 +986,30 @@ class MethodAdded(MemberAdded):
     label = "Method added"
 
 
+    __slots__ = ()
+
+
 class MethodRemoved(MemberRemoved):
 
     label = "Method removed"
 
 
+    __slots__ = ()
+
+
 class ClassMethodsChange(ClassMembersChange):
 
     label = "Methods"
 
 
+    __slots__ = ()
+
+
     member_added = MethodAdded
     member_removed = MethodRemoved
     member_changed = MethodChange
 
 
-    @yield_sorted_by_type(MethodAdded, MethodRemoved, MethodChange)
-    def collect_impl(self):
-        return super(ClassMethodsChange, self).collect_impl()
-
-
     def __init__(self, lclass, rclass):
         super(ClassMethodsChange, self).__init__(lclass.methods,
                                                  rclass.methods)
@@ -833,6 +1020,9 @@ class ClassConstantPoolChange(GenericChange):
     label = "Constant pool"
 
 
+    __slots__ = ()
+
+
     def fn_data(self, c):
         return c.cpool
 
@@ -852,6 +1042,10 @@ class ClassConstantPoolChange(GenericChange):
 class JavaClassChange(SuperChange):
 
     label = "Java Class"
+    retain_data = True
+
+
+    __slots__ = ()
 
 
     change_types = (ClassInfoChange,
@@ -871,6 +1065,8 @@ class JavaClassReport(JavaClassChange):
     a JavaClassChange with the side-effect of writing reports
     """
 
+    __slots__ = ("reporter",)
+
 
     def __init__(self, l, r, reporter):
         super(JavaClassReport, self).__init__(l, r)
@@ -878,8 +1074,9 @@ class JavaClassReport(JavaClassChange):
 
 
     def check(self):
-        super(JavaClassReport, self).check()
+        c = super(JavaClassReport, self).check()
         self.reporter.run(self)
+        return c
 
 
 # ---- Utility functions ----
@@ -894,25 +1091,13 @@ def pretty_merge_constants(left_cpool, right_cpool):
     type and pretty value for indexes past its end
     """
 
-    lsize = len(left_cpool.consts)
-    rsize = len(right_cpool.consts)
+    merged = zip_longest(left_cpool.iter_pretty_consts(),
+                         right_cpool.iter_pretty_consts(),
+                         fillvalue=(None, None))
 
-    index = 1
-    for index in range(1, min(lsize, rsize)):
-        lt, lv = left_cpool.pretty_const(index)
-        rt, rv = right_cpool.pretty_const(index)
+    for index, ((lt, lv), (rt, rv)) in enumerate(merged, 1):
         yield (index, lt, lv, rt, rv)
 
-    if lsize > rsize:
-        for index in range(index, lsize):
-            lt, lv = left_cpool.pretty_const(index)
-            yield (index, lt, lv, None, None)
-
-    elif rsize > lsize:
-        for index in range(index, rsize):
-            rt, rv = right_cpool.pretty_const(index)
-            yield (index, None, None, rt, rv)
-
 
 def merge_code(left_code, right_code):
     """
@@ -949,6 +1134,9 @@ def merge_code(left_code, right_code):
 
 
 def cli_classes_diff(options, left, right):
+    from .report import quick_report, Reporter
+    from .report import JSONReportFormat, TextReportFormat
+
     reports = getattr(options, "reports", tuple())
     if reports:
         rdir = options.report_dir or "./"
@@ -969,10 +1157,10 @@ def cli_classes_diff(options, left, right):
         else:
             quick_report(TextReportFormat, delta, options)
 
-    if (not delta.is_change()) or delta.is_ignored(options):
-        return 0
-    else:
-        return 1
+    result = int(delta.is_change() and not delta.is_ignored(options))
+    delta.clear()
+
+    return result
 
 
 def cli(options):
@@ -1111,15 +1299,17 @@ def create_optparser(progname=None):
     for the classdiff utility
     """
 
+    from . import report
+
     parser = ArgumentParser(prog=progname)
     parser.add_argument("classfile", nargs=2,
                         help="class files to compare")
     add_general_optgroup(parser)
     add_classdiff_optgroup(parser)
 
-    add_general_report_optgroup(parser)
-    add_json_report_optgroup(parser)
-    add_html_report_optgroup(parser)
+    report.add_general_report_optgroup(parser)
+    report.add_json_report_optgroup(parser)
+    report.add_html_report_optgroup(parser)
 
     return parser
 
@@ -33,6 +33,7 @@ from argparse import ArgumentParser
 from json import dump
 from six.moves import range
 
+from . import ACC_PROTECTED, ACC_PUBLIC
 from . import platform_from_version, unpack_classfile
 
 
@@ -63,9 +64,9 @@ def should_show(options, member):
 
     show = options.show
     if show == SHOW_PUBLIC:
-        return member.is_public()
+        return member.access_flags & ACC_PUBLIC
     elif show == SHOW_PACKAGE:
-        return member.is_public() or member.is_protected()
+        return member.access_flags & (ACC_PUBLIC | ACC_PROTECTED)
     elif show == SHOW_PRIVATE:
         return True
 
@@ -257,7 +258,7 @@ def cli_print_classinfo(options, info):
         # generator skips them.
         cpool = info.cpool
 
-        for i in range(1, len(cpool.consts)):
+        for i in range(1, len(cpool.tags)):
             t, v = cpool.pretty_const(i)
             if t:
                 # skipping the None consts, which would be the entries
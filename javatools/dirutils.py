@@ -22,10 +22,12 @@ trees
 """
 
 
+import re
+
 from filecmp import dircmp
-from fnmatch import fnmatch
+from fnmatch import fnmatch, translate
 from os import makedirs, walk
-from os.path import exists, isdir, join, relpath
+from os.path import exists, isdir, join, normcase, relpath
 from shutil import copy
 
 
@@ -48,6 +50,21 @@ def fnmatches(entry, *pattern_list):
     return False
 
 
+def fnmatcher(*pattern_list):
+    """
+    returns a function which behaves like fnmatches with the given
+    glob patterns, but which compiles them into a single regular
+    expression once rather than checking each pattern per entry
+    """
+
+    patterns = [translate(normcase(p)) for p in pattern_list if p]
+    if not patterns:
+        return lambda entry: False
+
+    match = re.compile("|".join("(?:%s)" % p for p in patterns)).match
+    return lambda entry: match(normcase(entry)) is not None
+
+
 def makedirsp(dirname):
     """
     create dirname if it doesn't exist
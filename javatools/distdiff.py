@@ -279,6 +279,7 @@ class DistChange(SuperChange):
     """
 
     label = "Distribution"
+    retain_data = True
 
 
     def __init__(self, left, right, shallow=False):
@@ -485,6 +486,7 @@ class DistReport(DistChange):
         for change in changes:
             c = c or change.is_change()
         self.changes = changes
+        self._collected = True
         return c, None
 
 
@@ -501,8 +503,7 @@ class DistReport(DistChange):
 
         c = False
         for change in self.collect_impl():
-            change.check()
-            c = c or change.is_change()
+            c = change.check() or c
 
             if isinstance(change, (DistJarReport, DistClassReport)):
                 # the child report has run, we only need to keep the
@@ -513,15 +514,17 @@ class DistReport(DistChange):
                 changes.append(change)
 
         self.changes = changes
+        self._collected = True
         return c, None
 
 
     def check(self):
         # do the actual checking
-        DistChange.check(self)
+        c = DistChange.check(self)
 
         # write to file
         self.reporter.run(self)
+        return c
 
 
 def _mp_run_check(tasks, results, options):
@@ -579,10 +582,10 @@ def cli_dist_diff(options, left, right):
         else:
             quick_report(TextReportFormat, delta, options)
 
-    if (not delta.is_change()) or delta.is_ignored(options):
-        return 0
-    else:
-        return 1
+    result = int(delta.is_change() and not delta.is_ignored(options))
+    delta.clear()
+
+    return result
 
 
 def cli(options):
@@ -465,8 +465,7 @@ class JarContentsReport(JarContentsChange):
                 self.rzip = rzip
 
                 for change in self.collect_impl():
-                    change.check()
-                    c = c or change.is_change()
+                    c = change.check() or c
 
                     if isinstance(change, JarClassReport):
                         changes.append(squash(change, options=options))
@@ -478,6 +477,7 @@ class JarContentsReport(JarContentsChange):
         self.rzip = None
 
         self.changes = changes
+        self._collected = True
         return c, None
 
 
@@ -505,10 +505,11 @@ class JarReport(JarChange):
 
     def check(self):
         # do the actual checking
-        JarChange.check(self)
+        c = JarChange.check(self)
 
         # write to file
         self.reporter.run(self)
+        return c
 
 
 # ---- Begin jardiff CLI ----
@@ -539,10 +540,10 @@ def cli_jars_diff(options, left, right):
         else:
             quick_report(TextReportFormat, delta, options)
 
-    if (not delta.is_change()) or delta.is_ignored(options):
-        return 0
-    else:
-        return 1
+    result = int(delta.is_change() and not delta.is_ignored(options))
+    delta.clear()
+
+    return result
 
 
 def cli(options):
@@ -36,6 +36,7 @@ __all__ = (
     "get_opcode_by_name", "get_opname_by_code",
     "get_arg_format", "has_const_arg",
     "disassemble",
+    "OPNAMES", "CONST_ARG_OPS",
     "OP_aaload", "OP_aastore", "OP_aconst_null", "OP_aload", "OP_aload_0",
     "OP_aload_1", "OP_aload_2", "OP_aload_3", "OP_anewarray", "OP_areturn",
     "OP_arraylength", "OP_astore", "OP_astore_0", "OP_astore_1",
@@ -84,6 +85,10 @@ __all__ = (
 # the op table itself
 __OPTABLE = {}
 
+# (struct, callable) pairs for unpacking the arguments of each op by
+# its value, for use by disassemble. At most one of the pair is set.
+__ARGTABLE = {}
+
 # mnemonics for the op tuples
 _OPINDEX_NAME = 0
 _OPINDEX_VAL = 1
@@ -114,7 +119,11 @@ def __op(name, val, fmt=None, const=False, consume=0, produce=0):
     # callable to do more complex unpacking. If it's a str, create a
     # callable for it.
     if isinstance(fmt, str):
-        fmt = partial(_unpack, compile_struct(fmt))
+        struct = compile_struct(fmt)
+        args = (struct, None)
+        fmt = partial(_unpack, struct)
+    else:
+        args = (None, fmt)
 
     operand = (name, val, fmt, consume, produce, const)
 
@@ -123,6 +132,7 @@ def __op(name, val, fmt=None, const=False, consume=0, produce=0):
 
     __OPTABLE[name] = operand
     __OPTABLE[val] = operand
+    __ARGTABLE[val] = args
 
     return val
 
@@ -235,24 +245,32 @@ def disassemble(bytecode):
     :type bytecode: bytes
     """
 
+    # indexing a bytearray gives ints under both Py2 and Py3
+    bytecode = bytearray(bytecode)
+    argtable = __ARGTABLE
+
     offset = 0
     end = len(bytecode)
 
     while offset < end:
-        orig_offset = offset
-
         code = bytecode[offset]
-        if not isinstance(code, int):   # Py3
-            code = ord(code)
+        struct, fmt = argtable[code]
 
-        offset += 1
+        if struct is not None:
+            # the common case of simple fixed-size args, unpacked
+            # in place rather than via a call to the fmt
+            args = struct.unpack_from(bytecode, offset + 1)
+            next_offset = offset + 1 + struct.size
 
-        args = tuple()
-        fmt = get_arg_format(code)
-        if fmt:
-            args, offset = fmt(bytecode, offset)
+        elif fmt is not None:
+            args, next_offset = fmt(bytecode, offset + 1)
 
-        yield (orig_offset, code, args)
+        else:
+            args = ()
+            next_offset = offset + 1
+
+        yield (offset, code, args)
+        offset = next_offset
 
 
 # And now, the OP codes themselves
@@ -481,5 +499,19 @@ OP_tableswitch = __op('tableswitch', 0xaa, fmt=_unpack_tableswitch)
 OP_wide = __op('wide', 0xc4, fmt=_unpack_wide)
 
 
+# the name of each opcode indexed by its value, or None for values
+# which are not opcodes. For loops which would otherwise call
+# get_opname_by_code per instruction.
+OPNAMES = tuple((__OPTABLE[code][_OPINDEX_NAME] if code in __OPTABLE
+                 else None) for code in range(0x100))
+
+# the values of the opcodes which have a constant pool index as their
+# first argument. For loops which would otherwise call has_const_arg
+# per instruction.
+CONST_ARG_OPS = frozenset(code for code in range(0x100)
+                          if code in __OPTABLE and
+                          __OPTABLE[code][_OPINDEX_CONST])
+
+
 #
 # The end.
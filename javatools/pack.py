@@ -34,7 +34,7 @@ or stream.
 from abc import ABCMeta, abstractmethod
 from six import add_metaclass
 from six.moves import range
-from struct import Struct
+from struct import Struct, error as StructError
 
 
 __all__ = (
@@ -120,6 +120,27 @@ class Unpacker(object):
         pass
 
 
+    def read_view(self, count):
+        """
+        read count bytes from the unpacker. Unpackers backed by a buffer
+        will return a memoryview onto that buffer rather than a copy,
+        others behave the same as read.
+        """
+
+        return self.read(count)
+
+
+    def read_remaining(self):
+        """
+        read all of the remaining data from the unpacker and return it.
+        Unpackers backed by a buffer will return a memoryview onto that
+        buffer rather than a copy. Not every unpacker can know how much
+        data remains, so this is optional for subclasses.
+        """
+
+        raise NotImplementedError("read_remaining")
+
+
     @abstractmethod
     def close(self):  # pragma: no cover
         """
@@ -178,6 +199,16 @@ class BufferUnpacker(Unpacker):
         super(BufferUnpacker, self).__init__()
         self.data = data
         self.offset = offset
+        self._view = None
+
+
+    def _avail(self):
+        """
+        count of bytes remaining in the underlying buffer
+        """
+
+        data = self.data
+        return (len(data) - self.offset) if data else 0
 
 
     def unpack(self, fmt):
@@ -187,20 +218,7 @@ class BufferUnpacker(Unpacker):
         data to satisfy the fmt
         """
 
-        sfmt = compile_struct(fmt)
-        size = sfmt.size
-
-        offset = self.offset
-        if self.data:
-            avail = len(self.data) - offset
-        else:
-            avail = 0
-
-        if avail < size:
-            raise UnpackException(fmt, size, avail)
-
-        self.offset = offset + size
-        return sfmt.unpack_from(self.data, offset)
+        return self.unpack_struct(compile_struct(fmt))
 
 
     def unpack_struct(self, struct):
@@ -210,19 +228,16 @@ class BufferUnpacker(Unpacker):
         enough data to satisfy the format of the structure
         """
 
-        size = struct.size
-
+        # rather than checking the available length on every call,
+        # let unpack_from complain and only then work out why
         offset = self.offset
-        if self.data:
-            avail = len(self.data) - offset
-        else:
-            avail = 0
-
-        if avail < size:
-            raise UnpackException(struct.format, size, avail)
+        try:
+            result = struct.unpack_from(self.data, offset)
+        except (StructError, TypeError):
+            raise UnpackException(struct.format, struct.size, self._avail())
 
-        self.offset = offset + size
-        return struct.unpack_from(self.data, offset)
+        self.offset = offset + struct.size
+        return result
 
 
     def read(self, count):
@@ -233,16 +248,53 @@ class BufferUnpacker(Unpacker):
         """
 
         offset = self.offset
-        if self.data:
-            avail = len(self.data) - offset
-        else:
-            avail = 0
+        end = offset + count
 
-        if avail < count:
-            raise UnpackException(None, count, avail)
+        data = self.data
+        buff = data[offset:end] if data else b""
+        if len(buff) < count:
+            raise UnpackException(None, count, self._avail())
+
+        self.offset = end
+        return buff
 
-        self.offset = offset + count
-        return self.data[offset:self.offset]
+
+    def read_view(self, count):
+        """
+        read count bytes from the underlying buffer and return them as a
+        memoryview, without copying. Raises an UnpackException if there
+        is not enough data in the underlying buffer.
+        """
+
+        view = self._view
+        if view is None:
+            data = self.data or b""
+            try:
+                view = memoryview(data)
+            except TypeError:
+                # the old py2 buffer type has no memoryview support,
+                # so those are sliced directly
+                view = data
+            self._view = view
+
+        offset = self.offset
+        end = offset + count
+
+        buff = view[offset:end]
+        if len(buff) < count:
+            raise UnpackException(None, count, self._avail())
+
+        self.offset = end
+        return buff
+
+
+    def read_remaining(self):
+        """
+        read the rest of the underlying buffer and return it as a
+        memoryview, without copying.
+        """
+
+        return self.read_view(self._avail())
 
 
     def close(self):
@@ -252,6 +304,7 @@ class BufferUnpacker(Unpacker):
 
         self.data = None
         self.offset = 0
+        self._view = None
 
 
 class StreamUnpacker(Unpacker):
@@ -324,6 +377,14 @@ class StreamUnpacker(Unpacker):
         return buff
 
 
+    def read_remaining(self):
+        """
+        read the rest of the underlying stream and return it
+        """
+
+        return self.data.read() if self.data else b""
+
+
     def close(self):
         """
         close this unpacker, and the underlying stream if it supports such
@@ -344,15 +405,15 @@ def unpack(data):
     unpacker:`
     """
 
-    if isinstance(data, (bytes, buffer)):
+    if isinstance(data, (bytes, buffer, memoryview)):
         return BufferUnpacker(data)
 
     elif hasattr(data, "read"):
         return StreamUnpacker(data)
 
     else:
-        raise TypeError("unpack requires bytes, buffer, or instance"
-                        " supporting the read method")
+        raise TypeError("unpack requires bytes, buffer, memoryview, or"
+                        " instance supporting the read method")
 
 
 class UnpackException(Exception):
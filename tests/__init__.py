@@ -21,10 +21,13 @@ license: LGPL v.3
 """
 
 
+from six import BytesIO
+import struct
 from unittest import TestCase
 
 import javatools as jt
 import javatools.opcodes as op
+from javatools.pack import BufferUnpacker, StreamUnpacker, unpack
 import pkg_resources
 
 
@@ -54,6 +57,31 @@ class Sample1Tests(TestCase):
         with open(fn, "rb") as f:
             data = f.read()
         self.assertTrue(jt.is_class(data))
+        self.assertTrue(jt.is_class(BytesIO(data)))
+
+        self.assertFalse(jt.is_class(data[:3]))
+        self.assertFalse(jt.is_class(BytesIO(data[1:])))
+
+    def test_unpack_class_magic(self):
+        fn = get_class_fn("Sample1")
+        with open(fn, "rb") as f:
+            magic = f.read(4)
+            data = f.read()
+
+        # the magic header may have already been consumed by the
+        # caller, in which case it's passed along separately
+        ci = jt.unpack_class(data, magic=magic)
+        self.assertEqual(ci.get_this(), "Sample1")
+        self.assertEqual(ci.magic, jt.JAVA_CLASS_MAGIC)
+
+        ci = jt.unpack_class(data, magic=jt.JAVA_CLASS_MAGIC)
+        self.assertEqual(ci.get_this(), "Sample1")
+
+        ci = jt.unpack_class(data, magic=u"\xca\xfe\xba\xbe")
+        self.assertEqual(ci.get_this(), "Sample1")
+
+        x = lambda: jt.unpack_class(data, magic=b"\x00\x00\x00\x00")
+        self.assertRaises(jt.ClassUnpackException, x)
 
     def test_classinfo(self):
         ci = load("Sample1")
@@ -75,6 +103,8 @@ class Sample1Tests(TestCase):
         self.assertFalse(ci.is_enum())
         self.assertFalse(ci.is_deprecated())
 
+        self.assertEqual(ci.pretty_access_flags(), ("public",))
+
         self.assertEqual(ci.get_super(), "java/lang/Object")
         self.assertEqual(ci.pretty_super(), "java.lang.Object")
 
@@ -139,6 +169,48 @@ class Sample1Tests(TestCase):
         x = lambda: ci.cpool.deref_const(0)
         self.assertRaises(IndexError, x)
 
+        # dereferenced values are cached after the first request
+        meth = ci.cpool.deref_const(2)
+        self.assertEqual(meth, ("Sample1",
+                                ("<init>", "(Ljava/lang/String;)V")))
+        self.assertIs(ci.cpool.deref_const(2), meth)
+
+
+    def test_pretty_deref_const(self):
+        consts = ((None, None),
+                  (jt.CONST_Utf8, "java.base"),
+                  (jt.CONST_Utf8, "java/lang"),
+                  (jt.CONST_Module, 1),
+                  (jt.CONST_Package, 2),
+                  (jt.CONST_MethodType, 6),
+                  (jt.CONST_Utf8, "(I)V"))
+
+        cpool = jt.JavaConstantPool()
+        cpool.tags = bytearray(t or 0 for t, _v in consts)
+        cpool.vals = [v for _t, v in consts]
+        cpool._deref_cache = [None] * len(consts)
+
+        self.assertEqual(cpool.pretty_deref_const(3), "Module java.base")
+        self.assertEqual(cpool.pretty_deref_const(4), "Package java/lang")
+        self.assertEqual(cpool.pretty_deref_const(5), "MethodType '(I)V'")
+
+
+    def test_const_pool_stream(self):
+        fn = get_class_fn("SampleLambdas")
+        with open(fn, "rb") as f:
+            data = f.read()
+
+        # buffers and streams take different paths through the
+        # constant pool unpacking, but must agree
+        from_buffer = jt.unpack_class(data)
+        from_stream = jt.JavaClassInfo()
+        with StreamUnpacker(BytesIO(data)) as up:
+            from_stream.unpack(up)
+
+        self.assertEqual(from_buffer.cpool, from_stream.cpool)
+        self.assertEqual(from_buffer.get_requires(),
+                         from_stream.get_requires())
+
 
     def test_field_name(self):
         ci = load("Sample1")
@@ -348,6 +420,12 @@ class Sample1Tests(TestCase):
         self.assertEqual(mi.pretty_identifier(),
                          "getName():java.lang.String")
 
+        # derived names are computed once and kept
+        self.assertIs(mi.get_identifier(), mi.get_identifier())
+        self.assertIs(mi.pretty_identifier(), mi.pretty_identifier())
+        self.assertIs(mi.pretty_descriptor(), mi.pretty_descriptor())
+        self.assertIs(mi.get_type_descriptor(), mi.get_type_descriptor())
+
         self.assertTrue(mi.is_public())
         self.assertTrue(mi.is_method)
 
@@ -375,6 +453,7 @@ class Sample1Tests(TestCase):
         code = mi.get_code()
 
         self.assertEqual(type(code), jt.JavaCodeInfo)
+        self.assertIs(mi.get_code(), code)
 
         lnt = code.get_linenumbertable()
         exp = ((0, 18), )
@@ -399,6 +478,45 @@ class Sample1Tests(TestCase):
                          "Sample1.name:java.lang.String")
 
 
+    def test_code_tables(self):
+        code = jt.JavaCodeInfo(jt.JavaConstantPool())
+
+        lnt = struct.pack(">H4H", 2, 0, 10, 4, 12)
+        lvt = struct.pack(">H10H", 2, 0, 8, 1, 2, 0, 4, 4, 3, 5, 1)
+
+        code.attribs["LineNumberTable"] = lnt
+        code.attribs["LocalVariableTable"] = lvt
+        code.attribs["LocalVariableTypeTable"] = lvt[:2]
+
+        self.assertEqual(code.get_linenumbertable(),
+                         ((0, 10), (4, 12)))
+        self.assertEqual(code.get_relativelinenumbertable(),
+                         ((0, 0), (4, 2)))
+        self.assertEqual(code.get_localvariabletable(),
+                         ((0, 8, 1, 2, 0), (4, 4, 3, 5, 1)))
+
+        # a table which is cut short rather than empty
+        self.assertRaises(jt.UnpackException,
+                          code.get_localvariabletypetable)
+
+
+    def test_line_for_offset(self):
+        code = jt.JavaCodeInfo(jt.JavaConstantPool())
+        code.attribs["LineNumberTable"] = struct.pack(
+            ">H6H", 3, 2, 10, 6, 12, 6, 13)
+
+        found = [code.get_line_for_offset(o) for o in range(0, 9)]
+        self.assertEqual(found, [0, 0, 10, 10, 10, 10, 12, 13, 13])
+
+        # tables which are not in code order are walked as-is
+        code = jt.JavaCodeInfo(jt.JavaConstantPool())
+        code.attribs["LineNumberTable"] = struct.pack(
+            ">H6H", 3, 0, 10, 8, 14, 4, 12)
+
+        found = [code.get_line_for_offset(o) for o in (0, 4, 8, 9)]
+        self.assertEqual(found, [10, 10, 14, 12])
+
+
     def test_method_get_recent_name(self):
         ci = load("Sample1")
         mi = ci.get_method("getRecentName")
@@ -958,6 +1076,12 @@ class Sample3Test(TestCase):
         excs = tuple(mi.pretty_exceptions())
         self.assertEqual(excs, ("java.lang.Exception",))
 
+        # these are tuples, so can be tested for emptiness and reused
+        self.assertEqual(mi.pretty_exceptions(), ("java.lang.Exception",))
+        self.assertEqual(mi.pretty_access_flags(),
+                         ("public", "synchronized"))
+        self.assertEqual(mi.pretty_arg_types(), ())
+
 
     def test_method_get_data_default(self):
         ci = load("Sample3")
@@ -1017,6 +1141,19 @@ class Sample3Test(TestCase):
 
         self.assertEqual(ce.info(), (0, 4, 5, "java/lang/Exception"))
 
+        # get_code defers the exception table and attributes, which
+        # should come out the same as when unpacked up front
+        eager = jt.JavaCodeInfo(ci.cpool)
+        with unpack(mi.get_attribute("Code")) as up:
+            eager.unpack(up)
+
+        self.assertEqual(eager.code, code.code)
+        self.assertEqual([e.info() for e in eager.exceptions],
+                         [e.info() for e in code.exceptions])
+        self.assertEqual(sorted(eager.attribs), sorted(code.attribs))
+        self.assertEqual(eager.get_linenumbertable(),
+                         code.get_linenumbertable())
+
 
     def test_method_set_data(self):
         ci = load("Sample3")
@@ -1155,5 +1292,125 @@ class Sample3Test(TestCase):
         self.assertEqual(excs, tuple())
 
 
+class TypeSeqTest(TestCase):
+
+    def test_typeseq(self):
+        seq = jt._typeseq("(Ljava/lang/String;[[IJ)V")
+        self.assertEqual(seq, ("(Ljava/lang/String;[[IJ)", "V"))
+
+        seq = jt._typeseq("Ljava/lang/String;[[IJ")
+        self.assertEqual(seq, ("Ljava/lang/String;", "[[I", "J"))
+
+        self.assertEqual(jt._typeseq(""), tuple())
+
+
+    def test_typeseq_malformed(self):
+        # a stray '.' swallows the rest of the signature
+        seq = jt._typeseq("I[Lcom.sun.State;.clone():java.lang.Object")
+        self.assertEqual(seq, ("I", "[Lcom.sun.State;",
+                               "clone():java.lang.Object"))
+
+        self.assertRaises(jt.Unimplemented, jt._typeseq, "IQ")
+        self.assertRaises(jt.Unimplemented, jt._typeseq, "ILFR1Xdn")
+
+
+class AnnotationValTest(TestCase):
+
+    def test_nested_arrays(self):
+        depth = 5000
+        data = (b"[\x00\x01" * depth) + b"I\x00\x07"
+
+        up = BufferUnpacker(data)
+        val = jt._unpack_annotation_val(up, jt.JavaConstantPool())
+        self.assertEqual(up.offset, len(data))
+
+        for _i in range(depth):
+            tag, val = val
+            self.assertEqual(tag, "[")
+            self.assertEqual(len(val), 1)
+            val = val[0]
+
+        self.assertEqual(val, ("I", 7))
+
+
+    def test_annotation_eq(self):
+        def pool(*names):
+            data = [struct.pack(">H", len(names) + 1)]
+            for name in names:
+                data.append(struct.pack(">BH", 1, len(name)) + name)
+            cpool = jt.JavaConstantPool()
+            cpool.unpack(BufferUnpacker(b"".join(data)))
+            return cpool
+
+        def anno(cpool, data):
+            found = jt.JavaAnnotation(cpool)
+            found.unpack(BufferUnpacker(data))
+            return found
+
+        # the same @LFoo;(x="bar", y={"bar"}) from two differently
+        # ordered constant pools, with the elements in opposite orders
+        left = anno(pool(b"LFoo;", b"x", b"y", b"bar"),
+                    b"\x00\x01\x00\x02"
+                    b"\x00\x02s\x00\x04"
+                    b"\x00\x03[\x00\x01s\x00\x04")
+        right = anno(pool(b"bar", b"y", b"x", b"LFoo;"),
+                     b"\x00\x04\x00\x02"
+                     b"\x00\x02[\x00\x01s\x00\x01"
+                     b"\x00\x03s\x00\x01")
+
+        self.assertEqual(left, right)
+        self.assertEqual(hash(left), hash(right))
+
+        other = anno(pool(b"LFoo;", b"x", b"bar"),
+                     b"\x00\x01\x00\x01\x00\x02s\x00\x03")
+        self.assertNotEqual(left, other)
+
+
+class Utf8Test(TestCase):
+
+    def test_decode_utf8(self):
+        self.assertEqual(jt._decode_utf8(b"java/lang/Object"),
+                         u"java/lang/Object")
+        self.assertEqual(jt._decode_utf8(b"caf\xc3\xa9"), u"caf\xe9")
+
+        # modified utf-8 encodes NUL as two bytes
+        self.assertEqual(jt._decode_utf8(b"a\xC0\x80b"), u"a\x00b")
+
+        # undecodable bytes are dropped rather than failing
+        self.assertEqual(jt._decode_utf8(b"a\xC0\x80\xffb"), u"a\x00b")
+
+
+class PlatformTest(TestCase):
+
+    def test_platform_from_version(self):
+        pfv = jt.platform_from_version
+
+        self.assertEqual(pfv(45, 3), "1.0.2")
+        self.assertEqual(pfv(45, 4), "1.1")
+        self.assertEqual(pfv(50, 0), "1.6")
+        self.assertEqual(pfv(52, 65535), "1.8")
+
+        self.assertEqual(pfv(44, 0), None)
+        self.assertEqual(pfv(99, 0), None)
+
+
+class OpcodesTest(TestCase):
+
+    def test_opcode_tables(self):
+        self.assertEqual(len(op.OPNAMES), 0x100)
+
+        for code, name in enumerate(op.OPNAMES):
+            if name is None:
+                continue
+
+            self.assertEqual(name, op.get_opname_by_code(code))
+            self.assertEqual(code in op.CONST_ARG_OPS,
+                             bool(op.has_const_arg(code)))
+
+        self.assertEqual(op.OPNAMES[op.OP_ldc], "ldc")
+        self.assertIn(op.OP_invokevirtual, op.CONST_ARG_OPS)
+        self.assertNotIn(op.OP_aload_0, op.CONST_ARG_OPS)
+
+
 #
 # The end.
@@ -0,0 +1,257 @@
+# This library is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation; either version 3 of the
+# License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, see
+# <http://www.gnu.org/licenses/>.
+
+
+"""
+unit tests for javatools.change
+
+author: Christopher O'Brien  <obriencj@gmail.com>
+license: LGPL v.3
+"""
+
+
+from unittest import TestCase
+
+from javatools.change import *
+
+
+class CollectTest(TestCase):
+
+
+    def test_collect_by_type(self):
+        data = [1, "a", 2, "b", 3.0]
+
+        found = collect_by_type(data)
+        self.assertEqual(found, {int: [1, 2], str: ["a", "b"],
+                                 float: [3.0]})
+
+        found = collect_by_typename(data)
+        self.assertEqual(found, {"int": [1, 2], "str": ["a", "b"],
+                                 "float": [3.0]})
+
+        cache = {int: [0]}
+        self.assertIs(collect_by_type(data, cache), cache)
+        self.assertEqual(cache[int], [0, 1, 2])
+
+
+    def test_iterate_by_type(self):
+        data = [1, "a", 2, "b", 3.0]
+
+        found = list(iterate_by_type(data, (str, bytearray, int)))
+        self.assertEqual(found, ["a", "b", 1, 2, 3.0])
+
+        found = list_by_type(data, (str, bytearray, int))
+        self.assertEqual(found, ["a", "b", 1, 2, 3.0])
+
+
+    def test_yield_sorted_by_type(self):
+        @yield_sorted_by_type(str, int)
+        def emit(data):
+            for val in data:
+                yield val
+
+        self.assertEqual(emit([1, "a", 3.0, 2, "b"]),
+                         ["a", "b", 1, 2, 3.0])
+
+
+class ChangeLeft(GenericChange):
+    label = "Left"
+
+
+    def fn_data(self, side_data):
+        return side_data[0]
+
+
+class ChangeRight(GenericChange):
+    label = "Right"
+
+
+    def fn_data(self, side_data):
+        return side_data[1]
+
+
+class ChangePair(SuperChange):
+    label = "Pair"
+    change_types = (ChangeLeft, ChangeRight)
+
+
+class GenericChangeTest(TestCase):
+
+
+    def test_differ_identity(self):
+        compared = []
+
+        class Data(object):
+            def __ne__(self, other):
+                compared.append(other)
+                return True
+
+        data = Data()
+
+        delta = GenericChange(data, data)
+        self.assertFalse(delta.check())
+        self.assertEqual(compared, [])
+
+        delta = GenericChange(data, Data())
+        self.assertTrue(delta.check())
+        self.assertEqual(len(compared), 1)
+
+
+class SuperChangeTest(TestCase):
+
+
+    def test_clear(self):
+        delta = ChangePair((1, 2), (1, 3))
+        delta.check()
+
+        self.assertTrue(delta.is_change())
+        left, right = delta.collect()
+        self.assertFalse(left.is_change())
+        self.assertTrue(right.is_change())
+
+        delta.clear()
+        self.assertEqual(delta.changes, ())
+        self.assertIs(right.ldata, None)
+        self.assertFalse(right.is_change())
+
+        # clearing again is harmless
+        delta.clear()
+        self.assertEqual(delta.changes, ())
+
+
+    def test_release_data(self):
+        delta = ChangePair((1, 2), (1, 3))
+        delta.check()
+
+        # the parent drops its data, the children keep theirs
+        self.assertIs(delta.ldata, None)
+        self.assertIs(delta.rdata, None)
+        self.assertEqual(delta.collect()[1].pretty_rdata(), 3)
+
+        class RetainedPair(ChangePair):
+            retain_data = True
+
+        delta = RetainedPair((1, 2), (1, 3))
+        delta.check()
+        self.assertEqual(delta.ldata, (1, 2))
+        self.assertEqual(delta.rdata, (1, 3))
+
+
+    def test_collect_empty(self):
+        calls = []
+
+        class EmptyChange(SuperChange):
+            def collect_impl(self):
+                calls.append(self)
+                return ()
+
+        delta = EmptyChange(1, 2)
+        delta.check()
+        self.assertEqual(delta.collect(), ())
+        self.assertEqual(len(calls), 1)
+
+        delta.collect(force=True)
+        self.assertEqual(len(calls), 2)
+
+
+    def test_check_result(self):
+        self.assertTrue(ChangePair((1, 2), (1, 3)).check())
+        self.assertFalse(ChangePair((1, 2), (1, 2)).check())
+
+        # additions and removals are always changes, even though
+        # their check does not set the changed flag
+        self.assertTrue(Addition(None, 1).check())
+        self.assertTrue(Removal(1, None).check())
+
+
+    def test_is_ignored_cached(self):
+        calls = []
+
+        class CountedRight(ChangeRight):
+            def is_ignored(self, options):
+                calls.append(options)
+                return options.ignore_right
+
+        class CountedPair(ChangePair):
+            change_types = (ChangeLeft, CountedRight)
+
+        class Options(object):
+            ignore_right = True
+
+        opts = Options()
+
+        delta = CountedPair((1, 2), (1, 3))
+        delta.check()
+
+        self.assertTrue(delta.is_ignored(opts))
+        self.assertTrue(delta.is_ignored(opts))
+        self.assertEqual(len(calls), 1)
+
+        # a different options object is queried anew
+        other = Options()
+        other.ignore_right = False
+        self.assertFalse(delta.is_ignored(other))
+        self.assertEqual(len(calls), 2)
+
+        # re-checking discards the cached answer
+        delta.check()
+        self.assertTrue(delta.is_ignored(opts))
+        self.assertEqual(len(calls), 3)
+
+
+class SquashTest(TestCase):
+
+
+    def test_squash(self):
+        delta = ChangePair((1, 2), (1, 3))
+        delta.check()
+
+        sq = squash(delta)
+        self.assertIs(type(sq), SquashedChange)
+        self.assertEqual(sq.label, "Pair")
+        self.assertTrue(sq.is_change())
+        self.assertIs(sq.origclass, ChangePair)
+        self.assertFalse(hasattr(sq, "__dict__"))
+
+        sq = squash(Addition(None, 1))
+        self.assertIs(type(sq), SquashedAddition)
+        self.assertEqual(sq.label, "Addition")
+        self.assertTrue(sq.simplify()["is_addition"])
+        self.assertFalse(hasattr(sq, "__dict__"))
+
+        simple = squash(Removal(1, None)).simplify()
+        self.assertTrue(simple["is_removal"])
+        self.assertNotIn("is_addition", simple)
+
+
+    def test_squash_children(self):
+        delta = ChangePair((1, 2), (1, 3))
+        delta.check()
+        left, right = delta.collect()
+
+        delta.squash_children(None)
+
+        squashed = delta.collect()
+        self.assertEqual([type(c) for c in squashed],
+                         [SquashedChange, SquashedChange])
+        self.assertEqual([c.is_change() for c in squashed], [False, True])
+        self.assertEqual(squashed[1].origclass, ChangeRight)
+
+        # the originals have been cleared
+        self.assertIs(right.ldata, None)
+        self.assertFalse(right.is_change())
+
+
+#
+# The end.
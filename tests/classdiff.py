@@ -22,8 +22,12 @@ license: LGPL v.3
 
 import os
 from unittest import TestCase
-from . import get_data_fn
-from javatools.classdiff import main
+from . import get_class_fn, get_data_fn
+from javatools import unpack_classfile
+from javatools.classdiff import main, pretty_merge_constants
+from javatools.classdiff import MethodCodeChange, ClassMethodsChange
+from javatools.classdiff import MethodAdded, MethodRemoved, MethodChange
+from javatools.classdiff import CodeBodyChange, CodeConstantsChange
 
 
 class ClassdiffTest(TestCase):
@@ -41,4 +45,134 @@ class ClassdiffTest(TestCase):
         # JSON reporting options:
         self.assertEqual(1, main(["argv0", "--json-indent=4", left, right]))
         # HTML reporting options:
-        self.assertEqual(1, main(["argv0", "--html-copy-data=foo", left, right]))
\ No newline at end of file
+        self.assertEqual(1, main(["argv0", "--html-copy-data=foo", left, right]))
+
+
+class MethodCodeChangeTest(TestCase):
+
+
+    def get_method_code_change(self, left, right, name):
+        lci = unpack_classfile(left)
+        rci = unpack_classfile(right)
+        delta = MethodCodeChange(lci.get_method(name), rci.get_method(name))
+        delta.check()
+        return delta
+
+
+    def get_code_checks(self, delta):
+        changes = delta.collect()
+        body = [c for c in changes if isinstance(c, CodeBodyChange)][0]
+        consts = [c for c in changes if isinstance(c, CodeConstantsChange)][0]
+        return body, consts
+
+
+    def test_shared_body_check(self):
+        fn = get_class_fn("Sample1")
+        delta = self.get_method_code_change(fn, fn, "getName")
+
+        self.assertFalse(delta.is_change())
+        body, consts = self.get_code_checks(delta)
+        self.assertIs(body.constants, consts)
+        self.assertIs(consts.body_changed, False)
+        self.assertFalse(body.is_change())
+
+        # the change classes are slotted all the way down
+        for change in (delta, body, consts):
+            self.assertFalse(hasattr(change, "__dict__"))
+
+        left = get_data_fn(os.path.join("test_classdiff", "Sample1.class"))
+        right = get_data_fn(os.path.join("test_classdiff", "Sample2.class"))
+        delta = self.get_method_code_change(left, right, "<init>")
+
+        self.assertTrue(delta.is_change())
+        body, consts = self.get_code_checks(delta)
+        self.assertTrue(body.is_change())
+        self.assertTrue(consts.is_change())
+
+
+    def test_identical_code_check(self):
+        lci = unpack_classfile(get_class_fn("Sample1"))
+        rci = unpack_classfile(get_data_fn(os.path.join("test_classdiff",
+                                                        "Sample2.class")))
+
+        walked = []
+
+        class Code(object):
+            def __init__(self, code, cpool):
+                self.code = code
+                self.cpool = cpool
+
+            def disassemble(self):
+                walked.append(self)
+                return ()
+
+        code = lci.get_method("getName").get_code().code
+
+        # same bytes and same pool, so no need to walk the opcodes
+        delta = CodeConstantsChange(Code(code, lci.cpool),
+                                    Code(bytearray(code), lci.cpool))
+        self.assertFalse(delta.check())
+        self.assertIs(delta.body_changed, False)
+        self.assertEqual(walked, [])
+
+        delta = CodeBodyChange(Code(code, lci.cpool), Code(code, rci.cpool))
+        self.assertFalse(delta.check())
+        self.assertEqual(walked, [])
+
+        # same bytes but the pools differ, so the constants are checked
+        delta = CodeConstantsChange(Code(code, lci.cpool),
+                                    Code(code, rci.cpool))
+        delta.check()
+        self.assertIs(delta.body_changed, False)
+        self.assertEqual(len(walked), 2)
+
+
+class MergeConstantsTest(TestCase):
+
+
+    def test_pretty_merge_constants(self):
+        left = unpack_classfile(get_class_fn("Sample1")).cpool
+        right = unpack_classfile(get_class_fn("Sample3")).cpool
+
+        lsize = len(left.tags)
+        rsize = len(right.tags)
+        self.assertNotEqual(lsize, rsize)
+
+        merged = list(pretty_merge_constants(left, right))
+        self.assertEqual(len(merged), max(lsize, rsize) - 1)
+
+        for index, lt, lv, rt, rv in merged:
+            if index < lsize:
+                self.assertEqual((lt, lv), left.pretty_const(index))
+            else:
+                self.assertEqual((lt, lv), (None, None))
+
+            if index < rsize:
+                self.assertEqual((rt, rv), right.pretty_const(index))
+            else:
+                self.assertEqual((rt, rv), (None, None))
+
+        self.assertEqual([m[0] for m in merged],
+                         list(range(1, max(lsize, rsize))))
+
+
+class ClassMembersChangeTest(TestCase):
+
+
+    def test_collect_order(self):
+        left = get_data_fn(os.path.join("test_classdiff", "Sample1.class"))
+        right = get_data_fn(os.path.join("test_classdiff", "Sample2.class"))
+
+        lci = unpack_classfile(left)
+        rci = unpack_classfile(right)
+
+        delta = ClassMethodsChange(lci, rci)
+        found = [type(c) for c in delta.collect()]
+
+        # grouped as additions, then removals, then changes
+        order = (MethodAdded, MethodRemoved, MethodChange)
+        self.assertEqual(found, sorted(found, key=order.index))
+        self.assertEqual(set(found), set(order))
+
+        # a method is present on both sides at most once
+        self.assertEqual(found.count(MethodChange), 1)
@@ -82,6 +82,36 @@ class UnpackerTests(object):
         self.assertRaises(UnpackException, lambda: up.unpack_struct(_H))
 
 
+    def test_read_view(self):
+        data = b"\x05\x04\x03\x02\x01"
+
+        with self.unpack(data) as up:
+            col = up.read_view(2)
+            self.assertEqual(bytearray(col), b"\x05\x04")
+
+            col = up.unpack(">H")
+            self.assertEqual(col, (0x0302,))
+
+            col = up.read_view(1)
+            self.assertEqual(bytearray(col), b"\x01")
+
+            self.assertRaises(UnpackException, lambda: up.read_view(1))
+
+
+    def test_read_remaining(self):
+        data = b"\x05\x04\x03\x02\x01"
+
+        with self.unpack(data) as up:
+            col = up.unpack(">H")
+            self.assertEqual(col, (0x0504,))
+
+            col = up.read_remaining()
+            self.assertEqual(bytearray(col), b"\x03\x02\x01")
+
+            col = up.read_remaining()
+            self.assertEqual(bytearray(col), b"")
+
+
     def test_array(self):
         data = "\x00\x02AB"
 
@@ -121,6 +151,53 @@ class BufferTest(UnpackerTests, TestCase):
                             "but {} received".format(type(data).__name__))
 
 
+class MemoryviewTest(UnpackerTests, TestCase):
+
+    def unpacker_type(self):
+        return BufferUnpacker
+
+
+    def unpack(self, data):
+        if isinstance(data, bytes):
+            return unpack(memoryview(data))
+        elif isinstance(data, str): # Py3 here, as in Py2 str is bytes
+            return unpack(memoryview(data.encode('utf-8')))
+        else:
+            raise TypeError("This test expects instance of 'bytes' or 'str', "
+                            "but {} received".format(type(data).__name__))
+
+
+class SubclassTest(TestCase):
+
+    def test_optional_methods(self):
+        # an unpacker implementing only the abstract methods can
+        # still be created, and falls back for the optional ones
+
+        class ListUnpacker(Unpacker):
+            def __init__(self, data):
+                super(ListUnpacker, self).__init__()
+                self.data = list(data)
+
+            def unpack(self, fmt):
+                return self.unpack_struct(compile_struct(fmt))
+
+            def unpack_struct(self, struct):
+                return struct.unpack(self.read(struct.size))
+
+            def read(self, count):
+                buff = bytes(bytearray(self.data[:count]))
+                del self.data[:count]
+                return buff
+
+            def close(self):
+                self.data = None
+
+        with ListUnpacker(b"\x05\x04\x03") as up:
+            self.assertEqual(up.read_view(1), b"\x05")
+            self.assertEqual(up.unpack(">H"), (0x0403,))
+            self.assertRaises(NotImplementedError, up.read_remaining)
+
+
 class StreamTest(UnpackerTests, TestCase):
 
     def unpacker_type(self):